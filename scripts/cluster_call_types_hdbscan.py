@@ -1,5 +1,4 @@
 
-import pandas as pd
 from sklearn.decomposition import PCA
 from sklearn.preprocessing import StandardScaler
 import hdbscan
@@ -7,17 +6,14 @@ import matplotlib.pyplot as plt
 from collections import Counter
 import os
 
-# Load merged call data
-df = pd.read_csv("data/processed/merged_spd_weather.csv", low_memory=False)
-df['Neighborhood'] = df['Dispatch Neighborhood'].astype(str).str.lower().str.strip()
-df = df[~df['Neighborhood'].isin(['-', 'unknown']) & df['Neighborhood'].notna()]
+import model_registry
+import out_of_core
+from model_registry import ClusterPipeline
 
-# Aggregate call types per neighborhood
-call_type_counts = (
-    df.groupby(['Neighborhood', 'Initial Call Type'])
-      .size()
-      .unstack(fill_value=0)
-)
+MERGED_DATA_PATH = "data/processed/merged_spd_weather.csv"
+
+# Aggregate call types per neighborhood with running counts over chunks of the file
+call_type_counts = out_of_core.call_type_matrix(MERGED_DATA_PATH)
 
 # Normalize features
 scaler = StandardScaler()
@@ -31,6 +27,18 @@ X_pca = pca.fit_transform(X_scaled)
 clusterer = hdbscan.HDBSCAN(min_cluster_size=3, prediction_data=True)
 labels = clusterer.fit_predict(X_pca)
 
+# Register the fitted pipeline so new periods can be scored with approximate_predict
+model_registry.register(
+    "hdbscan_call_types",
+    ClusterPipeline(scaler, pca, clusterer, call_type_counts.columns,
+                    info={
+                        "training_labels": dict(zip(call_type_counts.index, labels.tolist())),
+                        "training_total_calls": int(call_type_counts.to_numpy().sum()),
+                    }),
+    MERGED_DATA_PATH,
+    call_type_counts,
+)
+
 # Prepare results
 call_type_counts["hdbscan_cluster"] = labels
 call_type_counts["total_calls"] = call_type_counts.drop(columns=["hdbscan_cluster"]).sum(axis=1)
@@ -46,30 +54,9 @@ summary = call_type_counts.groupby("hdbscan_cluster").agg(
     AvgCalls=("total_calls", "mean")
 ).reset_index()
 
-# Top call types per cluster
-top_calls = (
-    df.groupby(['Neighborhood', 'Initial Call Type'])
-      .size()
-      .reset_index(name='count')
-)
-
-top_clusters = call_type_counts[['Neighborhood', 'hdbscan_cluster']]
-top_merged = top_calls.merge(top_clusters, on='Neighborhood', how='left')
-
-top_call_summary = (
-    top_merged.groupby(['hdbscan_cluster', 'Initial Call Type'])['count']
-    .sum()
-    .reset_index()
-    .sort_values(['hdbscan_cluster', 'count'], ascending=[True, False])
-    .groupby('hdbscan_cluster')
-    .head(3)
-)
-
-call_type_map = (
-    top_call_summary.groupby("hdbscan_cluster")["Initial Call Type"]
-    .apply(lambda x: ", ".join(x))
-    .to_dict()
-)
+# Top call types per cluster, from the per-neighborhood counts summed over each cluster
+call_type_map = out_of_core.top_strings(
+    call_type_counts.drop(columns=["Neighborhood", "total_calls"]).groupby("hdbscan_cluster").sum()).to_dict()
 
 summary["Top Call Types"] = summary["hdbscan_cluster"].map(call_type_map)
 
@@ -0,0 +1,182 @@
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from sklearn.decomposition import PCA
+from sklearn.metrics import adjusted_rand_score
+from sklearn.preprocessing import StandardScaler
+
+import spd_data
+
+# === CONFIG ===
+N_RESAMPLES = 500
+SUBSAMPLE_FRACTION = 0.8
+
+# Algorithm name -> settings mirroring the corresponding cluster_*.py script
+ALGORITHMS = {
+    "pca_agglomerative": {"row_normalize": True, "n_components": 5},
+    "hdbscan": {"row_normalize": False, "n_components": 2},
+    "gmm": {"row_normalize": False, "n_components": 2},
+    "kmeans": {"row_normalize": True, "n_components": None},
+}
+
+# Worker-side view of the shared feature matrix
+_X = None
+_SHM = None
+
+
+def make_estimator(algorithm, seed):
+    if algorithm == "pca_agglomerative":
+        from sklearn.cluster import AgglomerativeClustering
+        return AgglomerativeClustering(n_clusters=4)
+    if algorithm == "hdbscan":
+        import hdbscan
+        return hdbscan.HDBSCAN(min_cluster_size=3)
+    if algorithm == "gmm":
+        from sklearn.mixture import GaussianMixture
+        return GaussianMixture(n_components=3, random_state=seed)
+    if algorithm == "kmeans":
+        from sklearn.cluster import KMeans
+        return KMeans(n_clusters=4, random_state=seed, n_init=10)
+    raise ValueError(f"Unknown algorithm {algorithm!r}")
+
+
+def fit_labels(X, algorithm, seed):
+    """Run the algorithm's full pipeline (normalize -> scale -> PCA -> fit) on X."""
+    settings = ALGORITHMS[algorithm]
+    if settings["row_normalize"]:
+        totals = X.sum(axis=1, keepdims=True)
+        X = np.divide(X, totals, out=np.zeros_like(X), where=totals > 0)
+    X = StandardScaler().fit_transform(X)
+    if settings["n_components"]:
+        X = PCA(n_components=min(settings["n_components"], *X.shape), random_state=seed).fit_transform(X)
+    return make_estimator(algorithm, seed).fit_predict(X)
+
+
+def attach(name, shape, dtype):
+    """Pool initializer: map the parent's shared-memory block instead of copying the matrix."""
+    global _X, _SHM
+    _SHM = shared_memory.SharedMemory(name=name)
+    _X = np.ndarray(shape, dtype=dtype, buffer=_SHM.buf)
+
+
+def refit(task):
+    """One resample: returns the distinct sampled row indices and their labels."""
+    algorithm, seed, mode, fraction = task
+    rng = np.random.default_rng(seed)
+    n = _X.shape[0]
+    if mode == "bootstrap":
+        idx = rng.choice(n, size=n, replace=True)
+    else:
+        idx = np.sort(rng.choice(n, size=max(2, int(round(n * fraction))), replace=False))
+
+    labels = fit_labels(np.array(_X[idx]), algorithm, seed)
+    rows, first = np.unique(idx, return_index=True)
+    return rows.astype(np.int32), labels[first].astype(np.int16)
+
+
+class CoAssignment:
+    """Running co-assignment counts: how often each pair was sampled together and clustered together."""
+
+    def __init__(self, reference):
+        n = len(reference)
+        self.reference = reference
+        self.sampled = np.zeros((n, n), dtype=np.int32)
+        self.together = np.zeros((n, n), dtype=np.int32)
+        self.ari_sum = 0.0
+        self.ari_sq_sum = 0.0
+        self.count = 0
+
+    def update(self, rows, labels):
+        block = np.ix_(rows, rows)
+        self.sampled[block] += 1
+        # Noise points (-1) never count as co-assigned
+        self.together[block] += (labels[:, None] == labels[None, :]) & (labels[:, None] >= 0)
+        ari = adjusted_rand_score(self.reference[rows], labels)
+        self.ari_sum += ari
+        self.ari_sq_sum += ari * ari
+        self.count += 1
+
+    def matrix(self):
+        return np.divide(self.together, self.sampled, out=np.full(self.sampled.shape, np.nan),
+                         where=self.sampled > 0)
+
+    def ari(self):
+        mean = self.ari_sum / self.count
+        return mean, np.sqrt(max(self.ari_sq_sum / self.count - mean * mean, 0.0))
+
+
+def neighborhood_stability(co, reference):
+    """Mean co-assignment of each neighborhood with its reference cluster-mates."""
+    same = (reference[:, None] == reference[None, :]) & (reference[:, None] >= 0)
+    np.fill_diagonal(same, False)
+    same &= ~np.isnan(co)
+    totals = np.where(same, co, 0.0).sum(axis=1)
+    counts = same.sum(axis=1)
+    return np.divide(totals, counts, out=np.full(len(reference), np.nan), where=counts > 0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bootstrap/subsample stability of the neighborhood clusterings.")
+    parser.add_argument("--algorithm", choices=ALGORITHMS, default="pca_agglomerative")
+    parser.add_argument("--resamples", type=int, default=N_RESAMPLES)
+    parser.add_argument("--mode", choices=["subsample", "bootstrap"], default="subsample")
+    parser.add_argument("--fraction", type=float, default=SUBSAMPLE_FRACTION, help="subsample size as a share of rows")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    df = spd_data.valid_calls(spd_data.load_calls(usecols=['Dispatch Neighborhood', 'Initial Call Type']))
+    matrix = spd_data.call_type_matrix(df)
+    X = matrix.to_numpy(dtype=np.float64)
+    reference = fit_labels(X.copy(), args.algorithm, args.seed)
+
+    # The feature matrix goes into shared memory once; workers map it instead of unpickling copies
+    shm = shared_memory.SharedMemory(create=True, size=X.nbytes)
+    try:
+        np.ndarray(X.shape, dtype=X.dtype, buffer=shm.buf)[:] = X
+        tasks = [(args.algorithm, args.seed + i + 1, args.mode, args.fraction) for i in range(args.resamples)]
+        stats = CoAssignment(reference)
+
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=attach,
+                                 initargs=(shm.name, X.shape, X.dtype)) as pool:
+            for rows, labels in pool.map(refit, tasks, chunksize=max(1, len(tasks) // (4 * args.workers))):
+                stats.update(rows, labels)
+        elapsed = time.perf_counter() - start
+    finally:
+        shm.close()
+        shm.unlink()
+
+    co = stats.matrix()
+    stability = neighborhood_stability(co, reference)
+    per_neighborhood = pd.DataFrame({
+        "Neighborhood": matrix.index,
+        "cluster": reference,
+        "stability": stability.round(4),
+    })
+    summary = per_neighborhood.groupby("cluster").agg(
+        Neighborhoods=("Neighborhood", "count"),
+        MeanStability=("stability", "mean"),
+        MinStability=("stability", "min"),
+    ).reset_index()
+
+    os.makedirs(spd_data.OUTPUT_DIR, exist_ok=True)
+    prefix = os.path.join(spd_data.OUTPUT_DIR, f"{args.algorithm}_stability")
+    per_neighborhood.to_csv(f"{prefix}_neighborhoods.csv", index=False)
+    summary.to_csv(f"{prefix}_summary.csv", index=False)
+    pd.DataFrame(co, index=matrix.index, columns=matrix.index).round(4).to_csv(f"{prefix}_coassignment.csv")
+
+    ari_mean, ari_std = stats.ari()
+    print(f"✅ {args.resamples} {args.mode} refits of {args.algorithm} in {elapsed:.1f}s "
+          f"(ARI vs. full fit: {ari_mean:.3f} ± {ari_std:.3f})")
+    print(f"📊 Stability report saved to {prefix}_summary.csv, _neighborhoods.csv and _coassignment.csv")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.preprocessing import FunctionTransformer
+
+import model_registry
+import spd_data
+import vocabulary
+from model_registry import ClusterPipeline
+
+# === CONFIG ===
+N_CLUSTERS = 4
+BATCH_SIZE = 1024
+MIN_CALLS = 50          # units with fewer calls get no cluster (their profile is mostly noise)
+HOURS_PER_WEEK = 168
+DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+# Spatial unit -> (source column, output CSV)
+UNITS = {
+    "neighborhood": ("Dispatch Neighborhood", "output/neighborhood_temporal_clusters.csv"),
+    "beat": ("Dispatch Beat", "output/beat_temporal_clusters.csv"),
+}
+PROFILES = {"hour": 24, "hour_of_week": HOURS_PER_WEEK}
+
+
+def profile_slot_names(profile):
+    if profile == "hour":
+        return [f"{h:02d}:00" for h in range(24)]
+    return [f"{DAYS[s // 24]} {s % 24:02d}:00" for s in range(HOURS_PER_WEEK)]
+
+
+def hour_of_week_counts(chunks, unit):
+    """(n_units, 168) call counts per spatial unit, accumulated with one bincount per chunk."""
+    column = UNITS[unit][0]
+    labels, index = [], {}
+    counts = np.zeros((0, HOURS_PER_WEEK), dtype=np.int64)
+    for chunk in chunks:
+        names = chunk["Neighborhood"] if unit == "neighborhood" else vocabulary.normalize_distinct(chunk[column])
+        names = names.where(~names.isin(spd_data.INVALID_NEIGHBORHOODS + ["nan"]))
+        ts = pd.to_datetime(chunk[spd_data.TIMESTAMP_COL], errors="coerce", format="ISO8601")
+        slot = (ts.dt.dayofweek * 24 + ts.dt.hour).to_numpy()
+
+        codes, uniques = pd.factorize(names)
+        for name in uniques:
+            if name not in index:
+                index[name] = len(labels)
+                labels.append(name)
+        global_codes = np.array([index[name] for name in uniques], dtype=np.int64)
+        keep = (codes >= 0) & ~np.isnan(slot)
+        flat = global_codes[codes[keep]] * HOURS_PER_WEEK + slot[keep].astype(np.int64)
+
+        counts = np.vstack([counts, np.zeros((len(labels) - len(counts), HOURS_PER_WEEK), dtype=np.int64)])
+        counts += np.bincount(flat, minlength=counts.size).reshape(counts.shape)
+    return pd.DataFrame(counts, index=pd.Index(labels, name="Neighborhood" if unit == "neighborhood" else unit))
+
+
+def fold_profile(week_counts, profile):
+    """(n_units, slots) count array; 24-hour counts are the hour-of-week counts summed over the days."""
+    counts = week_counts.to_numpy()
+    if profile == "hour_of_week":
+        return counts
+    return counts.reshape(len(counts), 7, 24).sum(axis=1)
+
+
+def make_pipeline(n_clusters, batch_size, random_state=42):
+    """Row shares -> sqrt (Euclidean distance then tracks the Hellinger distance between profiles) -> k-means."""
+    return (FunctionTransformer(np.sqrt),
+            MiniBatchKMeans(n_clusters=n_clusters, batch_size=batch_size, n_init=3, random_state=random_state))
+
+
+def profile_summary(week_counts):
+    """Peak hour, night (00-06) and weekend shares per unit from the hour-of-week counts."""
+    week = week_counts.to_numpy().reshape(len(week_counts), 7, 24)
+    by_hour = week.sum(axis=1)
+    total = by_hour.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return pd.DataFrame({
+            "total_calls": total,
+            "peak_hour": by_hour.argmax(axis=1),
+            "night_share": (by_hour[:, :6].sum(axis=1) / total).round(4),
+            "weekend_share": (week[:, 5:].sum(axis=(1, 2)) / total).round(4),
+        }, index=week_counts.index)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cluster neighborhoods or beats by their time-of-day call profile.")
+    parser.add_argument("--unit", choices=list(UNITS), default="neighborhood")
+    parser.add_argument("--profile", choices=list(PROFILES), default="hour_of_week")
+    parser.add_argument("--clusters", type=int, default=N_CLUSTERS)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--min-calls", type=int, default=MIN_CALLS)
+    args = parser.parse_args(argv)
+
+    column, output_csv = UNITS[args.unit]
+    start = time.perf_counter()
+    chunks = spd_data.read_chunks(usecols=[spd_data.TIMESTAMP_COL, column, "Dispatch Neighborhood"])
+    week_counts = hour_of_week_counts(chunks, args.unit)
+    counts = fold_profile(week_counts, args.profile)
+    profile_time = time.perf_counter() - start
+
+    summary = profile_summary(week_counts)
+    eligible = summary["total_calls"].to_numpy() >= args.min_calls
+    if not eligible.any():
+        raise SystemExit(f"❌ No {args.unit} has {args.min_calls:,} calls (busiest: "
+                         f"{int(summary['total_calls'].max()) if len(summary) else 0:,}); lower --min-calls")
+    n_clusters = min(args.clusters, int(eligible.sum()))
+    shares = counts[eligible] / counts[eligible].sum(axis=1, keepdims=True)
+
+    start = time.perf_counter()
+    transform, kmeans = make_pipeline(n_clusters, args.batch_size)
+    labels = kmeans.fit_predict(transform.fit_transform(shares))
+    cluster_time = time.perf_counter() - start
+
+    summary["temporal_cluster"] = pd.NA
+    summary.loc[eligible, "temporal_cluster"] = labels
+    result = summary.reset_index()
+    os.makedirs(os.path.dirname(output_csv), exist_ok=True)
+    result.to_csv(output_csv, index=False)
+
+    slot_names = profile_slot_names(args.profile)
+    centers = pd.DataFrame(kmeans.cluster_centers_ ** 2, columns=slot_names)
+    centers = centers.div(centers.sum(axis=1), axis=0).round(5)
+    centers.index.name = "temporal_cluster"
+    centers_csv = output_csv.replace(".csv", f"_{args.profile}_centers.csv")
+    centers.to_csv(centers_csv)
+
+    model_registry.register(
+        f"temporal_{args.profile}_{args.unit}",
+        ClusterPipeline(None, None, kmeans, slot_names, row_normalize=True, feature_transform=transform),
+        spd_data.MERGED_DATA_PATH,
+        pd.DataFrame(counts[eligible], index=week_counts.index[eligible], columns=slot_names),
+        metadata={"unit": args.unit, "profile": args.profile, "min_calls": args.min_calls},
+    )
+
+    print(f"✅ {len(result)} {args.unit} {args.profile} profiles built in {profile_time:.2f}s, "
+          f"{int(eligible.sum())} clustered into {n_clusters} groups in {cluster_time:.2f}s")
+    print(result.groupby("temporal_cluster")[["total_calls", "peak_hour", "night_share", "weekend_share"]]
+          .agg({"total_calls": "sum", "peak_hour": "median", "night_share": "mean", "weekend_share": "mean"})
+          .round(3).to_string())
+    print(f"📊 Cluster labels saved to {output_csv}, centroid profiles to {centers_csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,10 @@ from sklearn.mixture import GaussianMixture
 import matplotlib.pyplot as plt
 import os
 
+import model_registry
+import out_of_core
+from model_registry import ClusterPipeline
+
 # === CONFIG ===
 MERGED_DATA_PATH = "data/processed/merged_spd_weather.csv"
 OUTPUT_DIR = "output"
@@ -14,13 +18,8 @@ CLUSTER_CSV_PATH = os.path.join(OUTPUT_DIR, "neighborhood_gmm_bic_clusters.csv")
 SUMMARY_CSV_PATH = os.path.join(OUTPUT_DIR, "gmm_bic_cluster_summary.csv")
 BIC_PLOT_PATH = os.path.join(OUTPUT_DIR, "gmm_bic_plot.png")
 
-# === LOAD AND CLEAN DATA ===
-df = pd.read_csv(MERGED_DATA_PATH, low_memory=False)
-df['Neighborhood'] = df['Dispatch Neighborhood'].astype(str).str.lower().str.strip()
-df = df[~df['Neighborhood'].isin(['-', 'unknown']) & df['Neighborhood'].notna()]
-
-# === BUILD CALL TYPE FREQUENCY MATRIX ===
-call_matrix = pd.crosstab(df['Neighborhood'], df['Initial Call Type'])
+# === BUILD CALL TYPE FREQUENCY MATRIX (streamed in chunks; the calls are never loaded at once) ===
+call_matrix = out_of_core.call_type_matrix(MERGED_DATA_PATH)
 call_matrix = call_matrix.loc[:, (call_matrix != 0).any(axis=0)]
 
 # === SCALE AND REDUCE DIMENSIONS ===
@@ -57,30 +56,13 @@ cluster_df = pd.DataFrame({
 cluster_df.to_csv(CLUSTER_CSV_PATH, index=False)
 print(f"✅ Cluster labels saved to {CLUSTER_CSV_PATH}")
 
-# === CLUSTER SUMMARY ===
-merged = pd.merge(df, cluster_df, left_on='Neighborhood', right_on='Neighborhood')
-
-top_calls = (
-    merged.groupby(['gmm_cluster', 'Initial Call Type'])
-    .size()
-    .reset_index(name='count')
-    .sort_values(['gmm_cluster', 'count'], ascending=[True, False])
-)
+# === REGISTER FITTED PIPELINE ===
+model_registry.register("gmm_bic_call_types", ClusterPipeline(scaler, pca, best_model, call_matrix.columns),
+                        MERGED_DATA_PATH, call_matrix, metadata={"n_components": best_n, "bic": min(bics)})
 
-top_calls_ranked = (
-    top_calls.groupby('gmm_cluster')
-    .head(3)
-    .groupby('gmm_cluster')['Initial Call Type']
-    .apply(lambda x: ', '.join(x))
-    .reset_index()
-    .rename(columns={'Initial Call Type': 'Top Call Types'})
-)
-
-call_counts = merged.groupby('gmm_cluster')['Neighborhood'].nunique().reset_index(name='Neighborhoods')
-avg_volume = merged.groupby('gmm_cluster')['Neighborhood'].value_counts().groupby('gmm_cluster').mean().reset_index(name='Avg Calls per Neighborhood')
-
-summary = pd.merge(call_counts, avg_volume, on='gmm_cluster')
-summary = pd.merge(summary, top_calls_ranked, on='gmm_cluster')
+# === CLUSTER SUMMARY ===
+# Neighborhood counts, mean volume and top call types come from the count matrix
+summary = out_of_core.cluster_summary(call_matrix, cluster_df, 'gmm_cluster')
 summary.to_csv(SUMMARY_CSV_PATH, index=False)
 
 print(f"📊 Cluster summary saved to {SUMMARY_CSV_PATH}")
@@ -1,20 +1,16 @@
 
-import pandas as pd
 from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
 from sklearn.cluster import AgglomerativeClustering
 
+import model_registry
+import out_of_core
+from model_registry import ClusterPipeline
+
 # === Load Call Type Matrix ===
-df = pd.read_csv("data/processed/merged_spd_weather.csv", low_memory=False)
-df['Neighborhood'] = df['Dispatch Neighborhood'].astype(str).str.lower().str.strip()
-df['Initial Call Type'] = df['Initial Call Type'].astype(str).str.lower().str.strip()
-valid_df = df[~df['Neighborhood'].isin(['-', 'unknown']) & df['Neighborhood'].notna()]
-
-call_type_matrix = (
-    valid_df.groupby(['Neighborhood', 'Initial Call Type'])
-    .size()
-    .unstack(fill_value=0)
-)
+MERGED_DATA_PATH = "data/processed/merged_spd_weather.csv"
+# Counted chunk by chunk, with normalized call-type names
+call_type_matrix = out_of_core.call_type_matrix(MERGED_DATA_PATH, normalize_call_types=True)
 
 # === Normalize to Proportions ===
 call_type_dist = call_type_matrix.div(call_type_matrix.sum(axis=1), axis=0)
@@ -28,6 +24,16 @@ X_pca = pca.fit_transform(X_scaled)
 # === Agglomerative Clustering ===
 agglo = AgglomerativeClustering(n_clusters=4)
 call_type_dist['pca_cluster'] = agglo.fit_predict(X_pca)
+
+# === Register Fitted Pipeline ===
+# Agglomerative clustering has no predict(); the pipeline assigns new rows to the nearest training neighborhood
+model_registry.register(
+    "pca_agglomerative_call_types",
+    ClusterPipeline(scaler, pca, agglo, call_type_matrix.columns, row_normalize=True,
+                    training_embedding=X_pca, training_labels=call_type_dist['pca_cluster'].values),
+    MERGED_DATA_PATH,
+    call_type_matrix,
+)
 call_type_dist['total_calls'] = call_type_matrix.sum(axis=1)
 
 # === Save Results ===
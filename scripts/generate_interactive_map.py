@@ -8,6 +8,9 @@ from shapely.geometry import Point
 import branca.colormap as cm
 import numpy as np
 
+import top_call_types
+import vocabulary
+
 # === Load Data ===
 df = pd.read_csv("data/processed/merged_spd_weather.csv", low_memory=False)
 gdf = gpd.read_file("data/raw/spd_dispatch_neighborhoods.geojson")
@@ -18,7 +21,7 @@ gdf['Neighborhood'] = gdf['Neighborhood'].str.lower().str.strip()
 gdf_web = gdf.to_crs(epsg=4326)
 
 # === Normalize call data neighborhoods ===
-df['Neighborhood'] = df['Dispatch Neighborhood'].astype(str).str.lower().str.strip()
+df['Neighborhood'] = vocabulary.decode_column(df, 'Dispatch Neighborhood')
 
 # === Filter out invalid entries ===
 valid_df = df[~df['Neighborhood'].isin(['-', 'unknown']) & df['Neighborhood'].notna()]
@@ -30,18 +33,7 @@ gdf_web = gdf_web.merge(call_counts, on='Neighborhood', how='left')
 gdf_web['call_count'] = gdf_web['call_count'].fillna(0)
 
 # === Compute top call types ===
-top_calls = (
-    valid_df.groupby(['Neighborhood', 'Initial Call Type'])
-    .size()
-    .reset_index(name='count')
-    .sort_values(['Neighborhood', 'count'], ascending=[True, False])
-)
-top_calls_ranked = top_calls.groupby('Neighborhood').head(3)
-call_type_map = (
-    top_calls_ranked.groupby('Neighborhood')['Initial Call Type']
-    .apply(lambda x: ', '.join(x))
-    .to_dict()
-)
+call_type_map = top_call_types.neighborhood_top_strings(valid_df, 3).to_dict()
 gdf_web['Top Call Types'] = gdf_web['Neighborhood'].map(call_type_map)
 
 # === Cluster neighborhoods ===
@@ -9,8 +9,16 @@ import numpy as np
 from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
 
+import model_registry
+import spd_data
+import top_call_types
+import vocabulary
+from model_registry import ClusterPipeline
+
 # === Load Data ===
-df = pd.read_csv("data/processed/merged_spd_weather.csv", low_memory=False)
+MERGED_DATA_PATH = "data/processed/merged_spd_weather.csv"
+df = spd_data.load_calls(MERGED_DATA_PATH, usecols=['Dispatch Neighborhood', 'Initial Call Type',
+                                                   'Initial Call Priority'])
 gdf = gpd.read_file("data/raw/spd_dispatch_neighborhoods.geojson")
 
 # === Normalize Neighborhood Names ===
@@ -18,8 +26,6 @@ gdf = gdf.rename(columns={"neighborhood": "Neighborhood"})
 gdf['Neighborhood'] = gdf['Neighborhood'].str.lower().str.strip()
 gdf_web = gdf.to_crs(epsg=4326)
 
-df['Neighborhood'] = df['Dispatch Neighborhood'].astype(str).str.lower().str.strip()
-
 # === Filter Valid Neighborhoods ===
 valid_df = df[~df['Neighborhood'].isin(['-', 'unknown']) & df['Neighborhood'].notna()]
 
@@ -40,19 +46,8 @@ else:
     gdf_web['cluster'] = 0
 
 # === Compute Top Call Types ===
-df['Initial Call Type'] = df['Initial Call Type'].astype(str).str.lower().str.strip()
-top_calls = (
-    df.groupby(['Neighborhood', 'Initial Call Type'])
-      .size()
-      .reset_index(name='count')
-      .sort_values(['Neighborhood', 'count'], ascending=[True, False])
-)
-top_calls_ranked = top_calls.groupby('Neighborhood').head(3)
-call_type_map = (
-    top_calls_ranked.groupby('Neighborhood')['Initial Call Type']
-    .apply(lambda x: ', '.join(x.head(3)))
-    .to_dict()
-)
+df['Initial Call Type'] = vocabulary.decode_column(df, 'Initial Call Type')
+call_type_map = top_call_types.neighborhood_top_strings(df, 3).to_dict()
 gdf_web['Top Call Types'] = gdf_web['Neighborhood'].map(call_type_map)
 
 # === Call Type Clustering ===
@@ -62,11 +57,22 @@ call_type_matrix = (
     .unstack(fill_value=0)
 )
 call_type_dist = call_type_matrix.div(call_type_matrix.sum(axis=1), axis=0)
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(call_type_dist)
-n_clusters = 4
-kmeans = KMeans(n_clusters=n_clusters, random_state=42)
-call_type_dist['call_type_cluster'] = kmeans.fit_predict(X_scaled)
+
+# Reuse the registered KMeans pipeline when it was fit on this exact matrix (hashing the small
+# crosstab is far cheaper than hashing the merged file)
+version = model_registry.find_matrix("kmeans_call_types", call_type_matrix)
+if version:
+    call_type_dist['call_type_cluster'] = model_registry.score(
+        model_registry.load("kmeans_call_types", version), call_type_matrix)
+else:
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(call_type_dist)
+    n_clusters = 4
+    kmeans = KMeans(n_clusters=n_clusters, random_state=42)
+    call_type_dist['call_type_cluster'] = kmeans.fit_predict(X_scaled)
+    model_registry.register("kmeans_call_types",
+                            ClusterPipeline(scaler, None, kmeans, call_type_matrix.columns, row_normalize=True),
+                            MERGED_DATA_PATH, call_type_matrix)
 call_type_dist['total_calls'] = call_type_matrix.sum(axis=1)
 call_type_dist.reset_index().to_csv("output/neighborhood_calltype_clusters.csv", index=False)
 print("✅ Saved call type clusters to output/neighborhood_calltype_clusters.csv")
@@ -0,0 +1,184 @@
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import fft
+
+import spd_data
+
+# === CONFIG ===
+CELL_SIZE_M = 100
+BANDWIDTH_M = 300
+TOP_HOTSPOTS = 25
+OUTPUT_PREFIX = "output/call_hotspots"
+
+
+class Grid:
+    """Regular metric grid over the Seattle bounding box."""
+
+    def __init__(self, bounds=spd_data.SEATTLE_BOUNDS, cell_size=CELL_SIZE_M):
+        self.south, self.west, self.north, self.east = bounds
+        self.cell_size = cell_size
+        self.nx = int(np.ceil((self.east - self.west) * spd_data.M_PER_DEG_LON / cell_size))
+        self.ny = int(np.ceil((self.north - self.south) * spd_data.M_PER_DEG_LAT / cell_size))
+
+    def cell_index(self, lat, lon):
+        """Flat cell index for each coordinate, -1 outside the grid."""
+        ix = np.floor((lon - self.west) * spd_data.M_PER_DEG_LON / self.cell_size).astype(np.int64)
+        iy = np.floor((lat - self.south) * spd_data.M_PER_DEG_LAT / self.cell_size).astype(np.int64)
+        inside = (ix >= 0) & (ix < self.nx) & (iy >= 0) & (iy < self.ny)
+        return np.where(inside, iy * self.nx + ix, -1)
+
+    def cell_centers(self, flat_index):
+        iy, ix = np.divmod(flat_index, self.nx)
+        lat = self.south + (iy + 0.5) * self.cell_size / spd_data.M_PER_DEG_LAT
+        lon = self.west + (ix + 0.5) * self.cell_size / spd_data.M_PER_DEG_LON
+        return lat, lon
+
+
+def gaussian_kernel(bandwidth, cell_size):
+    sigma = bandwidth / cell_size
+    radius = int(np.ceil(4 * sigma))
+    offsets = np.arange(-radius, radius + 1)
+    k1 = np.exp(-0.5 * (offsets / sigma) ** 2)
+    kernel = np.outer(k1, k1)
+    return kernel / kernel.sum()
+
+
+def grid_counts(cells, groups, n_groups, grid):
+    """(n_groups, ny, nx) call counts from flat cell indices and group codes in one bincount."""
+    keep = (cells >= 0) & (groups >= 0)
+    flat = groups[keep].astype(np.int64) * (grid.ny * grid.nx) + cells[keep]
+    counts = np.bincount(flat, minlength=n_groups * grid.ny * grid.nx)
+    return counts.reshape(n_groups, grid.ny, grid.nx).astype(np.float32)
+
+
+def fft_smooth(counts, kernel):
+    """Convolve every (ny, nx) layer with the kernel via one batched real FFT ('same' output)."""
+    ny, nx = counts.shape[-2:]
+    ky, kx = kernel.shape
+    shape = (fft.next_fast_len(ny + ky - 1, real=True), fft.next_fast_len(nx + kx - 1, real=True))
+    kernel_f = fft.rfft2(kernel, s=shape)
+    smoothed = fft.irfft2(fft.rfft2(counts, s=shape, axes=(-2, -1)) * kernel_f, s=shape, axes=(-2, -1))
+    oy, ox = ky // 2, kx // 2
+    return np.clip(smoothed[..., oy:oy + ny, ox:ox + nx], 0, None).astype(np.float32)
+
+
+def group_codes(df, group_by):
+    """Integer group per call plus the group labels."""
+    if group_by == "all":
+        return np.zeros(len(df), dtype=np.int64), ["all"]
+    if group_by == "hour_of_week":
+        ts = pd.to_datetime(df[spd_data.TIMESTAMP_COL], errors="coerce")
+        how = (ts.dt.dayofweek * 24 + ts.dt.hour).fillna(-1).astype(np.int64).to_numpy()
+        days = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+        return how, [f"{days[h // 24]} {h % 24:02d}:00" for h in range(168)]
+    if group_by == "priority":
+        priority = np.trunc(pd.to_numeric(df["Initial Call Priority"], errors="coerce"))
+        codes, uniques = pd.factorize(priority, sort=True)
+        return codes.astype(np.int64), [f"P{int(p)}" for p in uniques]
+    raise ValueError(f"Unknown grouping {group_by!r}")
+
+
+def hotspots(density, counts, grid, labels, top_n=TOP_HOTSPOTS):
+    """Top-N densest cells for every group as one ranked table."""
+    flat_density = density.reshape(len(labels), -1)
+    top_n = min(top_n, flat_density.shape[1])
+    top = np.argpartition(flat_density, -top_n, axis=1)[:, -top_n:]
+    order = np.argsort(-np.take_along_axis(flat_density, top, axis=1), axis=1)
+    top = np.take_along_axis(top, order, axis=1)
+
+    group_idx = np.repeat(np.arange(len(labels)), top_n)
+    cells = top.ravel()
+    lat, lon = grid.cell_centers(cells)
+    return pd.DataFrame({
+        "group": np.asarray(labels, dtype=object)[group_idx],
+        "rank": np.tile(np.arange(1, top_n + 1), len(labels)),
+        "lat": lat.round(6),
+        "lon": lon.round(6),
+        "density_per_km2": (flat_density[group_idx, cells] / (grid.cell_size / 1000) ** 2).round(2),
+        "calls_in_cell": counts.reshape(len(labels), -1)[group_idx, cells].astype(int),
+    })
+
+
+def density_overlay(layer, grid, name, cmap="YlOrRd", show=True):
+    """Folium ImageOverlay for one density raster (north-up, transparent where empty)."""
+    import folium
+    import matplotlib
+
+    scaled = layer / layer.max() if layer.max() > 0 else layer
+    rgba = matplotlib.colormaps[cmap](scaled)
+    rgba[..., 3] = np.where(scaled > 0.02, 0.25 + 0.55 * scaled, 0.0)
+    return folium.raster_layers.ImageOverlay(
+        image=(rgba[::-1] * 255).astype(np.uint8),
+        bounds=[[grid.south, grid.west], [grid.north, grid.east]],
+        name=name,
+        show=show,
+    )
+
+
+def build_map(density, grid, labels, ranked, path):
+    import folium
+
+    m = folium.Map(location=spd_data.SEATTLE_CENTER, zoom_start=12, tiles="CartoDB positron")
+    density_overlay(density.sum(axis=0), grid, "KDE: All Calls").add_to(m)
+    if len(labels) <= 12:
+        for layer, label in zip(density, labels):
+            density_overlay(layer, grid, f"KDE: {label}", show=False).add_to(m)
+
+    top = folium.FeatureGroup(name="Top Hotspot Cells", show=False)
+    for row in ranked[ranked["rank"] <= 10].itertuples():
+        folium.CircleMarker([row.lat, row.lon], radius=4, color="black", weight=1, fill=True,
+                            tooltip=f"{row.group} #{row.rank}: {row.density_per_km2:,.0f} calls/km²").add_to(top)
+    top.add_to(m)
+    folium.LayerControl().add_to(m)
+    m.save(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FFT kernel density hotspots of call locations.")
+    parser.add_argument("--group-by", choices=["all", "hour_of_week", "priority"], default="all")
+    parser.add_argument("--cell-size", type=float, default=CELL_SIZE_M, help="grid cell size in meters")
+    parser.add_argument("--bandwidth", type=float, default=BANDWIDTH_M, help="Gaussian kernel sigma in meters")
+    parser.add_argument("--top", type=int, default=TOP_HOTSPOTS, help="hotspot cells to rank per group")
+    parser.add_argument("--map", action="store_true", help="also write a folium map with density overlays")
+    args = parser.parse_args(argv)
+
+    usecols = [spd_data.LATITUDE_COL, spd_data.LONGITUDE_COL]
+    if args.group_by == "hour_of_week":
+        usecols.append(spd_data.TIMESTAMP_COL)
+    elif args.group_by == "priority":
+        usecols.append("Initial Call Priority")
+    df = pd.read_csv(spd_data.MERGED_DATA_PATH, usecols=usecols, low_memory=False)
+
+    start = time.perf_counter()
+    grid = Grid(cell_size=args.cell_size)
+    lat = pd.to_numeric(df[spd_data.LATITUDE_COL], errors="coerce").to_numpy()
+    lon = pd.to_numeric(df[spd_data.LONGITUDE_COL], errors="coerce").to_numpy()
+    cells = grid.cell_index(lat, lon)
+    groups, labels = group_codes(df, args.group_by)
+
+    counts = grid_counts(cells, groups, len(labels), grid)
+    density = fft_smooth(counts, gaussian_kernel(args.bandwidth, args.cell_size))
+    ranked = hotspots(density, counts, grid, labels, args.top)
+    elapsed = time.perf_counter() - start
+
+    prefix = f"{OUTPUT_PREFIX}_{args.group_by}"
+    os.makedirs(os.path.dirname(prefix), exist_ok=True)
+    np.savez_compressed(f"{prefix}.npz", density=density, groups=np.asarray(labels),
+                        bounds=np.array([grid.south, grid.west, grid.north, grid.east]),
+                        cell_size=grid.cell_size)
+    ranked.to_csv(f"{prefix}.csv", index=False)
+    print(f"✅ Gridded {int(counts.sum()):,} calls into {len(labels)} x {grid.ny} x {grid.nx} rasters "
+          f"in {elapsed:.2f}s; saved to {prefix}.npz and {prefix}.csv")
+
+    if args.map:
+        build_map(density, grid, labels, ranked, f"{prefix}_map.html")
+        print(f"✅ Map saved to {prefix}_map.html")
+
+
+if __name__ == "__main__":
+    main()
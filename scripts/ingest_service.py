@@ -0,0 +1,290 @@
+
+import argparse
+import asyncio
+import csv
+import io
+import os
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+
+import spd_data
+import vocabulary
+from vocabulary import Vocabulary
+
+# === CONFIG ===
+FEED_CSV = "data/raw/SeattlePD_CallDataset.csv"
+WEATHER_CSV = "data/raw/seattle_weather_apr2023_apr2025.csv"
+INGESTED_CSV = "data/processed/ingested_calls.csv"
+EVENTS_PER_SECOND = 500
+QUEUE_SIZE = 5_000
+BATCH_SIZE = 1_000
+FLUSH_INTERVAL_S = 1.0
+REPORT_INTERVAL_S = 5.0
+LAG_WINDOW = 100_000        # most recent events kept for the lag percentiles
+EPOCH = datetime(1970, 1, 1)
+TIMESTAMP_FORMATS = ("%m/%d/%Y %I:%M:%S %p", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S")
+
+
+# === FEED STAND-INS ===
+async def paced_lines(path, rate, follow=False):
+    """Yield lines of a CSV at `rate` lines/sec; with `follow`, keep tailing for appended lines."""
+    interval = 1.0 / rate if rate > 0 else 0.0
+    next_due = time.monotonic()
+    with open(path, newline="") as f:
+        while True:
+            line = f.readline()
+            if not line:
+                if not follow:
+                    return
+                await asyncio.sleep(0.2)
+                continue
+            yield line
+            if interval:
+                next_due += interval
+                delay = next_due - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                elif delay < -1.0:
+                    next_due = time.monotonic()  # don't burst to catch up after a stall
+
+
+async def serve_replay(path, rate, host="127.0.0.1", port=0):
+    """Local TCP server that replays the CSV to each client; returns the server and its port."""
+    async def handle(reader, writer):
+        try:
+            async for line in paced_lines(path, rate):
+                writer.write(line.encode())
+                await writer.drain()  # blocks when the client stops reading
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    return server, server.sockets[0].getsockname()[1]
+
+
+async def socket_lines(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while line := await reader.readline():
+            yield line.decode()
+    finally:
+        writer.close()
+
+
+# === ENRICHMENT ===
+def load_weather(path=WEATHER_CSV):
+    """Daily weather keyed by ISO date, read once and kept in memory."""
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    fields = [c for c in rows[0] if c != "date"] if rows else []
+    return fields, {row["date"][:10]: [row[c] for c in fields] for row in rows}
+
+
+def parse_timestamp(value):
+    for fmt in TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+class Stats:
+    def __init__(self):
+        self.start = time.monotonic()
+        self.events = 0
+        self.lags = deque(maxlen=LAG_WINDOW)  # bounded: the service may run indefinitely
+
+    def record(self, received):
+        done = time.monotonic()
+        self.events += len(received)
+        self.lags.extend(done - r for r in received)
+
+    def report(self, final=False):
+        elapsed = time.monotonic() - self.start
+        lags = np.fromiter(self.lags, dtype=float, count=len(self.lags)) * 1000 if self.lags else np.zeros(1)
+        label = "Final" if final else "Status"
+        print(f"{label}: {self.events:,} events in {elapsed:.1f}s ({self.events / max(elapsed, 1e-9):,.0f} ev/s), "
+              f"end-to-end lag p50 {np.percentile(lags, 50):.1f} ms, p99 {np.percentile(lags, 99):.1f} ms")
+
+
+# === PIPELINE ===
+async def csv_records(lines):
+    """Parse CSV records from a stream of lines; a quoted field may contain newlines.
+
+    Lines are buffered while a quote is open (odd number of `"` so far, since an
+    escaped `""` adds two), and the complete record is then parsed with csv.reader.
+    """
+    pending, quotes = [], 0
+    async for line in lines:
+        pending.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+        row = next(csv.reader(io.StringIO("".join(pending))), None)
+        pending, quotes = [], 0
+        if row:
+            yield row
+
+
+async def read_feed(lines, queue):
+    """Parse feed records into (received_time, row) and enqueue; `put` blocks when the queue is full."""
+    header = None
+    async for row in csv_records(lines):
+        if header is None:
+            header = row
+            await queue.put(("header", header))
+            continue
+        await queue.put((time.monotonic(), row))
+    await queue.put(None)
+
+
+def write_batch(path, header, rows, vocab, code_positions):
+    """Encode and append one micro-batch (runs in a worker thread)."""
+    for column, position in code_positions.items():
+        codes = vocab.encode(column, np.array([row[position] for row in rows], dtype=object))
+        for row, code in zip(rows, codes):
+            row.append(int(code))
+    new_file = not os.path.exists(path)
+    with open(path, "a", newline="") as f:
+        out = csv.writer(f)
+        if new_file:
+            out.writerow(header)
+        out.writerows(rows)
+
+
+async def write_batches(queue, path, weather, vocab, batch_size, flush_interval, stats, detector=None):
+    weather_fields, weather_by_date = weather
+    missing_weather = [""] * len(weather_fields)
+    header = out_header = ts_pos = None
+    code_positions = {}
+    batch, received = [], []
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + flush_interval
+
+    async def flush():
+        nonlocal batch, received, deadline
+        if batch:
+            await asyncio.to_thread(write_batch, path, out_header, batch, vocab, code_positions)
+            stats.record(received)
+        batch, received = [], []
+        deadline = loop.time() + flush_interval
+
+    while True:
+        try:
+            item = await asyncio.wait_for(queue.get(), timeout=max(deadline - loop.time(), 0.001))
+        except asyncio.TimeoutError:
+            await flush()
+            continue
+        if item is None:
+            break
+        if item[0] == "header":
+            header = item[1]
+            ts_pos = header.index(spd_data.TIMESTAMP_COL)
+            code_positions = {c: header.index(c) for c in vocabulary.CODE_COLUMNS if c in header}
+            out_header = header + ["date"] + weather_fields + [vocabulary.CODE_COLUMNS[c] for c in code_positions]
+            continue
+
+        received_at, row = item
+        ts = parse_timestamp(row[ts_pos])
+        day = ts.date().isoformat() if ts else ""
+        if ts:
+            row[ts_pos] = ts.isoformat(sep=" ")
+        batch.append(row + [day] + weather_by_date.get(day, missing_weather))
+        received.append(received_at)
+
+        if detector is not None and ts:
+            alert = detector.observe_names(row, code_positions, ts)
+            if alert:
+                print(f"🚨 Surge: {alert}")
+
+        if len(batch) >= batch_size or loop.time() >= deadline:
+            await flush()
+    await flush()
+
+
+class SurgeHook:
+    """Feeds ingested events to a saved SurgeDetector (see surge_detector.py)."""
+
+    def __init__(self, vocab):
+        from surge_detector import SurgeDetector
+        self.vocab = vocab
+        self.detector = SurgeDetector.load(n_neighborhoods=len(vocab.terms["Dispatch Neighborhood"]),
+                                           n_call_types=len(vocab.terms["Initial Call Type"]))
+
+    def observe_names(self, row, code_positions, ts):
+        n = self.vocab.index["Dispatch Neighborhood"].get(row[code_positions["Dispatch Neighborhood"]].lower().strip())
+        t = self.vocab.index["Initial Call Type"].get(row[code_positions["Initial Call Type"]].lower().strip())
+        if n is None or t is None:
+            return None
+        alert = self.detector.observe(n, t, (ts - EPOCH).total_seconds())
+        if alert:
+            return f"{self.vocab.terms['Dispatch Neighborhood'][n]} / {self.vocab.terms['Initial Call Type'][t]}: {alert[0]} calls this hour"
+        return None
+
+
+async def run(args):
+    vocab = Vocabulary.load()
+    weather = load_weather(args.weather)
+    stats = Stats()
+    queue = asyncio.Queue(maxsize=args.queue_size)
+    detector = SurgeHook(vocab) if args.surge else None
+
+    server = None
+    if args.source == "socket":
+        server, port = await serve_replay(args.feed, args.rate)
+        lines = socket_lines("127.0.0.1", port)
+        print(f"Replaying {args.feed} over 127.0.0.1:{port} at {args.rate} ev/s")
+    else:
+        lines = paced_lines(args.feed, args.rate, follow=args.follow)
+        print(f"Reading {args.feed} at {args.rate} ev/s{' (following)' if args.follow else ''}")
+
+    async def report():
+        while True:
+            await asyncio.sleep(REPORT_INTERVAL_S)
+            stats.report()
+
+    reporter = asyncio.create_task(report())
+    try:
+        await asyncio.gather(
+            read_feed(lines, queue),
+            write_batches(queue, args.output, weather, vocab, args.batch_size, args.flush_interval, stats, detector),
+        )
+    finally:
+        reporter.cancel()
+        if server is not None:
+            server.close()
+        vocab.save()
+        if detector is not None:
+            detector.detector.save()
+    stats.report(final=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Asyncio ingestion of a live CAD feed stand-in.")
+    parser.add_argument("--source", choices=["file", "socket"], default="file")
+    parser.add_argument("--feed", default=FEED_CSV, help="CSV replayed (or tailed) as the live feed")
+    parser.add_argument("--follow", action="store_true", help="keep tailing the feed file for new lines")
+    parser.add_argument("--rate", type=float, default=EVENTS_PER_SECOND, help="events/sec (0 = as fast as possible)")
+    parser.add_argument("--weather", default=WEATHER_CSV)
+    parser.add_argument("--output", default=INGESTED_CSV)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--flush-interval", type=float, default=FLUSH_INTERVAL_S)
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE, help="bounded queue size (backpressure)")
+    parser.add_argument("--surge", action="store_true", help="feed events to the saved surge detector")
+    args = parser.parse_args(argv)
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        print("Stopped.")
+
+
+if __name__ == "__main__":
+    main()
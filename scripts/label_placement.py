@@ -0,0 +1,96 @@
+
+from textwrap import wrap
+
+import numpy as np
+import shapely
+
+
+def candidate_offsets(step, layers, directions=12):
+    """All (dx, dy) label offsets, ring by ring, as a (layers * directions, 2) array."""
+    angles = np.linspace(0, 2 * np.pi, directions, endpoint=False)
+    radii = step * np.arange(1, layers + 1)
+    return np.stack([
+        (radii[:, None] * np.cos(angles)).ravel(),
+        (radii[:, None] * np.sin(angles)).ravel(),
+    ], axis=1)
+
+
+def display_label(name, length_threshold, max_wrap_width):
+    # Shorten long names
+    if len(name) > length_threshold:
+        display_name = name[:4].title() + "..."
+    else:
+        display_name = name.title()
+    return "\n".join(wrap(display_name, width=max_wrap_width))
+
+
+def place_neighborhood_labels(ax, gdf, name_col='Neighborhood',
+                              length_threshold=20,
+                              area_threshold=1e8,
+                              max_wrap_width=14,
+                              label_box_size=(4000, 2000),
+                              offset_step=2000,
+                              offset_layers=6):
+    """
+    Place neighborhood labels with overlap avoidance and leader lines.
+
+    Small or long-named neighborhoods get an external label at the first ring
+    offset that lies outside every polygon and does not overlap an already placed
+    label. Every candidate position is generated and tested for containment up
+    front (one vectorized call against the prepared union of all polygons), and
+    overlap checks go through an STRtree of candidate boxes, so placement stays
+    fast for hundreds of labels.
+    """
+    geoms = np.asarray(gdf.geometry.values, dtype=object)
+    names = gdf[name_col].to_numpy(dtype=object)
+
+    usable = ~shapely.is_empty(geoms) & np.array([isinstance(name, str) for name in names])
+    geoms, names = geoms[usable], names[usable]
+    if len(geoms) == 0:
+        return
+
+    anchors = shapely.get_coordinates(shapely.point_on_surface(geoms))
+    areas = shapely.area(geoms)
+    name_lengths = np.array([len(name) for name in names])
+    external = (name_lengths > length_threshold) | (areas < area_threshold)
+
+    # Candidate label centers for every external label: (n_external, n_offsets, 2)
+    offsets = candidate_offsets(offset_step, offset_layers)
+    ext_idx = np.flatnonzero(external)
+    centers = anchors[ext_idx][:, None, :] + offsets[None, :, :]
+    flat = centers.reshape(-1, 2)
+
+    # Avoid placing inside the map
+    land = shapely.union_all(geoms)
+    shapely.prepare(land)
+    available = ~shapely.contains_xy(land, flat[:, 0], flat[:, 1])
+
+    width, height = label_box_size
+    boxes = shapely.box(flat[:, 0] - width / 2, flat[:, 1] - height / 2,
+                        flat[:, 0] + width / 2, flat[:, 1] + height / 2)
+    tree = shapely.STRtree(boxes)
+
+    chosen = {}
+    n_offsets = len(offsets)
+    for row, i in enumerate(ext_idx):
+        candidates = np.flatnonzero(available[row * n_offsets:(row + 1) * n_offsets])
+        if len(candidates) == 0:
+            continue
+        k = row * n_offsets + candidates[0]
+        chosen[i] = flat[k]
+        # Block every candidate box, for any label, that overlaps the one just placed
+        available[tree.query(boxes[k], predicate="intersects")] = False
+
+    for i, (name, (x_anchor, y_anchor)) in enumerate(zip(names, anchors)):
+        wrapped_name = display_label(name, length_threshold, max_wrap_width)
+        if i in chosen:
+            x_label, y_label = chosen[i]
+            # Draw leader line
+            ax.plot([x_anchor, x_label], [y_anchor, y_label], color='gray', linewidth=0.5)
+            ax.text(x_label, y_label, wrapped_name,
+                    fontsize=8, ha='center', va='center',
+                    bbox=dict(boxstyle='round,pad=0.2', fc='white', ec='none', alpha=0.85))
+        else:
+            # Internal label, or fallback when no external spot is free
+            ax.text(x_anchor, y_anchor, wrapped_name,
+                    fontsize=8, ha='center', va='center')
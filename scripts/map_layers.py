@@ -0,0 +1,113 @@
+
+import os
+import time
+
+import pandas as pd
+import folium
+import matplotlib
+import matplotlib.colors as mcolors
+
+import population_overlay
+import spd_data
+
+# === CONFIG ===
+CALLTYPE_CLUSTERS_CSV = "output/neighborhood_calltype_clusters.csv"
+HDBSCAN_CLUSTERS_CSV = "output/neighborhood_hdbscan_clusters.csv"
+GMM_BIC_CLUSTERS_CSV = "output/neighborhood_gmm_bic_clusters.csv"
+PCA_CLUSTERS_CSV = "output/neighborhood_pca_clusters.csv"
+TEMPORAL_CLUSTERS_CSV = "output/neighborhood_temporal_clusters.csv"
+
+# Layer name -> (cluster CSV, columns) for the layers read from clustering output
+CLUSTER_LAYERS = {
+    "calltype": (CALLTYPE_CLUSTERS_CSV, ["Neighborhood", "call_type_cluster", "total_calls"]),
+    "hdbscan": (HDBSCAN_CLUSTERS_CSV, ["Neighborhood", "hdbscan_cluster"]),
+    "gmm_bic": (GMM_BIC_CLUSTERS_CSV, ["Neighborhood", "gmm_cluster"]),
+    "pca": (PCA_CLUSTERS_CSV, ["Neighborhood", "pca_cluster", "total_calls"]),
+    "temporal": (TEMPORAL_CLUSTERS_CSV, ["Neighborhood", "temporal_cluster", "peak_hour", "night_share",
+                                         "total_calls"]),
+}
+PRIORITY_LAYERS = ["priority_heat_all", "priority_heat_valid"]
+
+
+# === SHARED LAYERS ===
+def read_clusters(path, columns):
+    if not os.path.exists(path):
+        return None
+    clusters = pd.read_csv(path)
+    clusters['Neighborhood'] = clusters['Neighborhood'].str.lower().str.strip()
+    return clusters[columns]
+
+
+def priority_heat(centroid_df):
+    """Priority-weighted heatmap points for all calls and for calls with a valid neighborhood.
+
+    Leaflet.heat sums the intensity of points that share a grid cell, so one point
+    per centroid carrying the summed weight renders identically to one point per
+    call while keeping the serialized HTML small.
+    """
+    df = spd_data.load_calls(usecols=['Dispatch Neighborhood', 'Initial Call Priority'])
+    df['weight'] = spd_data.priority_weights(df['Initial Call Priority'])
+    weights = df.groupby('Neighborhood')['weight'].sum().rename('weight').reset_index()
+    valid_weights = spd_data.valid_calls(df).groupby('Neighborhood')['weight'].sum().rename('weight').reset_index()
+    return {
+        "priority_heat_all": centroid_df.merge(weights, on="Neighborhood")[["lat", "lon", "weight"]].values.tolist(),
+        "priority_heat_valid": centroid_df.merge(valid_weights, on="Neighborhood")[["lat", "lon", "weight"]].values.tolist(),
+    }
+
+
+def load_layers(keys=None):
+    """Read the inputs for the `keys` layers (default: all) once; missing inputs load as None."""
+    keys = set(keys) if keys is not None else set(CLUSTER_LAYERS) | set(PRIORITY_LAYERS) | {"population"}
+    gdf = spd_data.load_neighborhoods()
+
+    # Area and centroids are computed once in a metric CRS; the frame itself stays in EPSG:4326
+    projected = gdf.geometry.to_crs(epsg=3395)
+    gdf["area_km2"] = projected.area / 1e6
+    layers = {"gdf": gdf}
+
+    if keys & set(PRIORITY_LAYERS) and os.path.exists(spd_data.MERGED_DATA_PATH):
+        centroids = projected.centroid.to_crs(epsg=4326)
+        centroid_df = pd.DataFrame({
+            "Neighborhood": gdf["Neighborhood"],
+            "lat": centroids.y,
+            "lon": centroids.x,
+        }).drop_duplicates("Neighborhood")
+        layers.update(priority_heat(centroid_df))
+
+    for key, (path, columns) in CLUSTER_LAYERS.items():
+        if key in keys:
+            layers[key] = read_clusters(path, columns)
+
+    if "population" in keys and os.path.exists(spd_data.POPULATION_GEOJSON):
+        layers["population"] = population_overlay.neighborhood_population()
+
+    return layers
+
+
+def missing_layers(layers, keys):
+    return [key for key in keys if layers.get(key) is None]
+
+
+def base_map():
+    return folium.Map(location=spd_data.SEATTLE_CENTER, zoom_start=12, tiles="CartoDB positron")
+
+
+def discrete_colors(cmap_name, n_clusters):
+    colormap = matplotlib.colormaps[cmap_name].resampled(max(n_clusters, 1))
+    return {i: mcolors.to_hex(colormap(i)) for i in range(n_clusters)}
+
+
+def save(m, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    m.save(path)
+
+
+def render(build, keys, path):
+    """Standalone entry point of a map script: load only its layers, build the map and save it."""
+    start = time.perf_counter()
+    layers = load_layers(keys)
+    missing = missing_layers(layers, keys)
+    if missing:
+        raise SystemExit(f"⚠️ Missing inputs {missing}; run the clustering step that writes them first")
+    save(build(layers), path)
+    print(f"✅ Map saved to {path} ({time.perf_counter() - start:.2f}s)")
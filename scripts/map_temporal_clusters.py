@@ -0,0 +1,46 @@
+
+import argparse
+
+import pandas as pd
+import folium
+from folium.features import GeoJsonTooltip
+
+import map_layers
+
+# === CONFIG ===
+OUTPUT_MAP = "output/temporal_cluster_map.html"
+LAYERS = ["temporal"]
+
+
+def build(layers):
+    gdf = layers["gdf"].merge(layers["temporal"], on="Neighborhood", how="left")
+    # Neighborhoods below the clustering's min-calls cut have no label; the column can be all NaN
+    labels = gdf["temporal_cluster"].dropna()
+    color_dict = map_layers.discrete_colors("Set2", int(labels.max()) + 1 if len(labels) else 0)
+
+    def style_function(feature):
+        cluster = feature["properties"].get("temporal_cluster")
+        color = color_dict.get(int(cluster), "#cccccc") if cluster is not None and pd.notna(cluster) else "#cccccc"
+        return {"fillColor": color, "color": "black", "weight": 1, "fillOpacity": 0.6}
+
+    m = map_layers.base_map()
+    folium.GeoJson(
+        gdf.drop(columns=["area_km2"]),
+        tooltip=GeoJsonTooltip(fields=["Neighborhood", "temporal_cluster", "peak_hour", "night_share", "total_calls"],
+                               aliases=["Neighborhood:", "Time-of-Day Cluster:", "Peak Hour:",
+                                        "Share 00-06h:", "Total Calls:"],
+                               localize=True),
+        style_function=style_function,
+        name="Time-of-Day Profile Clusters"
+    ).add_to(m)
+    folium.LayerControl().add_to(m)
+    return m
+
+
+def main(argv=None):
+    argparse.ArgumentParser(description="Choropleth of the time-of-day profile clusters.").parse_args(argv)
+    map_layers.render(build, LAYERS, OUTPUT_MAP)
+
+
+if __name__ == "__main__":
+    main()
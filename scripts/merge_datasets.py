@@ -1,5 +1,11 @@
+import os
+
 import pandas as pd
 
+import partitioned_store
+import station_weather
+from vocabulary import Vocabulary
+
 # === CONFIGURATION ===
 SPD_CALLS_PATH = "data/raw/SeattlePD_CallDataset.csv"  # or full dataset CSV
 WEATHER_DATA_PATH = "data/raw/seattle_weather_apr2023_apr2025.csv"
@@ -23,6 +29,21 @@ weather_df['date'] = pd.to_datetime(weather_df['date'])
 print("Merging datasets...")
 merged_df = pd.merge(calls_df, weather_df, on='date', how='left')
 
-# === STEP 4: Save to file ===
+# === STEP 4: Attach per-neighborhood hourly weather (if station_weather.py build has run) ===
+if os.path.exists(station_weather.CUBE_PATH):
+    print("Attaching neighborhood hourly weather...")
+    station_weather.attach_neighborhood_weather(merged_df, timestamp_col=CALL_TIMESTAMP_COL)
+
+# === STEP 5: Encode neighborhoods and call types ===
+print("Encoding neighborhoods and call types...")
+vocab = Vocabulary.load()
+vocab.add_codes(merged_df)
+vocab.save()
+
+# === STEP 6: Save to file ===
 merged_df.to_csv(OUTPUT_PATH, index=False)
 print(f"Merged dataset saved to {OUTPUT_PATH}")
+
+# === STEP 7: Write the year/month partitioned store ===
+partitioned_store.write_store(merged_df)
+print(f"Partitioned store written to {partitioned_store.STORE_DIR}")
@@ -0,0 +1,218 @@
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import vocabulary
+
+# === CONFIG ===
+REGISTRY_DIR = "models/registry"
+SCORE_CHUNK_ROWS = 100_000
+
+
+class ClusterPipeline:
+    """A fitted clustering pipeline: optional row normalization -> feature transform -> scaler -> PCA -> estimator.
+
+    `feature_transform` is a fitted elementwise step such as a sqrt FunctionTransformer;
+    any of the feature transform, scaler and PCA may be None.
+
+    Estimators without `predict` are handled too: HDBSCAN models use
+    `approximate_predict`, and anything else (e.g. AgglomerativeClustering) gets a
+    1-nearest-neighbour assigner over the training embedding.
+    """
+
+    def __init__(self, scaler, pca, estimator, feature_names, row_normalize=False,
+                 training_embedding=None, training_labels=None, info=None, feature_transform=None):
+        self.feature_transform = feature_transform
+        self.scaler = scaler
+        self.pca = pca
+        self.estimator = estimator
+        self.feature_names = list(feature_names)
+        self.row_normalize = row_normalize
+        self.info = dict(info or {})
+        self.assigner = None
+        if not hasattr(estimator, "predict") and not self._is_hdbscan():
+            from sklearn.neighbors import KNeighborsClassifier
+            self.assigner = KNeighborsClassifier(n_neighbors=1).fit(training_embedding, training_labels)
+
+    def _is_hdbscan(self):
+        return type(self.estimator).__module__.startswith("hdbscan")
+
+    def align(self, frame):
+        """Reorder a neighborhood x call-type frame to the training columns."""
+        return frame.reindex(columns=self.feature_names, fill_value=0)
+
+    def transform(self, X):
+        X = np.asarray(X, dtype=float)
+        if self.row_normalize:
+            totals = X.sum(axis=1, keepdims=True)
+            X = np.divide(X, totals, out=np.zeros_like(X), where=totals > 0)
+        if self.feature_transform is not None:
+            X = self.feature_transform.transform(X)
+        if self.scaler is not None:
+            if hasattr(self.scaler, "feature_names_in_"):
+                X = pd.DataFrame(X, columns=self.scaler.feature_names_in_)
+            X = self.scaler.transform(X)
+        return self.pca.transform(X) if self.pca is not None else X
+
+    def predict(self, X):
+        Z = self.transform(X)
+        if self.assigner is not None:
+            return self.assigner.predict(Z)
+        if self._is_hdbscan():
+            import hdbscan
+            return hdbscan.approximate_predict(self.estimator, Z)[0]
+        return self.estimator.predict(Z)
+
+
+def versions(name):
+    model_dir = os.path.join(REGISTRY_DIR, name)
+    if not os.path.isdir(model_dir):
+        return []
+    return sorted((d for d in os.listdir(model_dir) if d.startswith("v")), key=lambda d: int(d[1:]))
+
+
+def pipeline_params(pipeline):
+    """Settings of every step (class and constructor parameters as strings), comparable across runs."""
+    params = {"row_normalize": pipeline.row_normalize}
+    steps = {"feature_transform": pipeline.feature_transform, "scaler": pipeline.scaler, "pca": pipeline.pca,
+             "estimator": pipeline.estimator}
+    for step, obj in steps.items():
+        if obj is not None:
+            params[step] = {"class": type(obj).__name__,
+                            **{key: repr(value) for key, value in sorted(obj.get_params(deep=False).items())}}
+    return params
+
+
+def register(name, pipeline, data_path, matrix, metadata=None):
+    """Save a fitted pipeline as the next version of `name`; returns the version directory.
+
+    `matrix` is the feature frame the pipeline was fit on. When a version fit on the
+    same matrix with the same parameters already exists it is reused instead, so
+    rerunning a script on unchanged data does not add versions.
+    """
+    matrix_sha256 = matrix_hash(matrix)
+    params = pipeline_params(pipeline)
+    existing = _find(name, matrix_sha256, params)
+    if existing:
+        print(f"📦 {name} {existing} was fit on this matrix with these parameters; reusing it")
+        return os.path.join(REGISTRY_DIR, name, existing)
+
+    version = f"v{len(versions(name)) + 1}"
+    version_dir = os.path.join(REGISTRY_DIR, name, version)
+    os.makedirs(version_dir)
+
+    # Uncompressed so numpy arrays inside the pipeline can be memory-mapped on load
+    joblib.dump(pipeline, os.path.join(version_dir, "pipeline.joblib"), compress=0)
+    vocabulary.Vocabulary.load().save(os.path.join(version_dir, "vocabulary.json"))
+
+    meta = {
+        "name": name,
+        "version": version,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "data_path": data_path,
+        "matrix_sha256": matrix_sha256,
+        "estimator": type(pipeline.estimator).__name__,
+        "n_features": len(pipeline.feature_names),
+        "params": params,
+        **(metadata or {}),
+    }
+    with open(os.path.join(version_dir, "metadata.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    print(f"📦 Registered {name} {version}")
+    return version_dir
+
+
+def metadata(name, version="latest"):
+    version = versions(name)[-1] if version == "latest" else version
+    with open(os.path.join(REGISTRY_DIR, name, version, "metadata.json")) as f:
+        return json.load(f)
+
+
+def load(name, version="latest", mmap=True):
+    """Load a registered pipeline; large arrays stay memory-mapped instead of being copied."""
+    available = versions(name)
+    if not available:
+        raise FileNotFoundError(f"No registered versions of {name!r} under {REGISTRY_DIR}")
+    version = available[-1] if version == "latest" else version
+    path = os.path.join(REGISTRY_DIR, name, version, "pipeline.joblib")
+    return joblib.load(path, mmap_mode="r" if mmap else None)
+
+
+def matrix_hash(frame):
+    """SHA-256 of a feature frame's values, row labels and column names (cheap for a crosstab)."""
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    digest.update("\x1f".join(map(str, frame.columns)).encode())
+    return digest.hexdigest()
+
+
+def _find(name, matrix_sha256, params=None):
+    for version in reversed(versions(name)):
+        meta = metadata(name, version)
+        if meta.get("matrix_sha256") == matrix_sha256 and (params is None or meta.get("params") == params):
+            return version
+    return None
+
+
+def find_matrix(name, frame, params=None):
+    """Latest version of `name` fitted on exactly this feature frame (and `params`, if given), or None."""
+    return _find(name, matrix_hash(frame), params)
+
+
+def score(pipeline, X, chunk_rows=SCORE_CHUNK_ROWS):
+    """Assign clusters to a (possibly memory-mapped) feature matrix in row chunks."""
+    if isinstance(pipeline, str):
+        pipeline = load(pipeline)
+    if isinstance(X, pd.DataFrame):
+        X = pipeline.align(X).to_numpy()
+    labels = np.empty(len(X), dtype=np.int32)
+    for start in range(0, len(X), chunk_rows):
+        stop = start + chunk_rows
+        labels[start:stop] = pipeline.predict(X[start:stop])
+    return labels
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect registered clustering pipelines and batch-score matrices.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="list registered models and versions")
+    score_parser = sub.add_parser("score", help="assign clusters to a feature matrix")
+    score_parser.add_argument("name")
+    score_parser.add_argument("matrix", help=".npy matrix (memory-mapped) or CSV with the row id in the first column")
+    score_parser.add_argument("--version", default="latest")
+    score_parser.add_argument("--output", required=True, help="CSV for the assigned labels")
+    score_parser.add_argument("--chunk-rows", type=int, default=SCORE_CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for name in sorted(os.listdir(REGISTRY_DIR)) if os.path.isdir(REGISTRY_DIR) else []:
+            for version in versions(name):
+                meta = metadata(name, version)
+                print(f"{name} {version}  {meta['estimator']}  {meta['created']}  matrix={meta['matrix_sha256'][:12]}")
+        return
+
+    pipeline = load(args.name, args.version)
+    if args.matrix.endswith(".npy"):
+        X = np.load(args.matrix, mmap_mode="r")
+        index = np.arange(len(X))
+    else:
+        frame = pd.read_csv(args.matrix, index_col=0)
+        X, index = pipeline.align(frame).to_numpy(), frame.index
+
+    start = time.perf_counter()
+    labels = score(pipeline, X, args.chunk_rows)
+    elapsed = time.perf_counter() - start
+    pd.DataFrame({"id": index, "cluster": labels}).to_csv(args.output, index=False)
+    print(f"✅ Scored {len(labels)} rows in {elapsed:.2f}s; labels saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+
+"""Neighborhood x call-type counts and cluster summaries without loading the merged data.
+
+    python scripts/out_of_core.py matrix [--source data/processed/calls_store]
+    python scripts/out_of_core.py label gmm --output data/processed/calls_gmm.csv
+
+The first pass holds one chunk plus the running count matrix, which is all the
+clustering and summary scripts need. Cluster labels are attached to the calls in
+a second pass that writes chunk by chunk, so the joined frame never exists.
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import partitioned_store
+import spd_data
+import top_call_types
+import vocabulary
+
+# === CONFIG ===
+MATRIX_PATH = "data/processed/call_type_matrix.csv"
+TOP_K = 3
+USECOLS = ["Dispatch Neighborhood", "Initial Call Type"]
+
+
+# === FIRST PASS: RUNNING COUNTS ===
+def read_calls(source=spd_data.MERGED_DATA_PATH, usecols=None, chunk_rows=spd_data.CHUNK_ROWS):
+    """Chunks of the merged CSV, or of the partitioned Parquet store when `source` is its directory."""
+    if os.path.isdir(source):
+        return partitioned_store.read_chunks(usecols, chunk_rows, source)
+    return spd_data.read_chunks(source, usecols, chunk_rows)
+
+
+def _global_codes(series, index):
+    """Codes into the growing `index` (name -> position) for each value; missing values get -1."""
+    codes, uniques = pd.factorize(series)
+    for name in uniques:
+        if name not in index:
+            index[name] = len(index)
+    lookup = np.array([index[name] for name in uniques] + [-1], dtype=np.int64)
+    return lookup[codes]
+
+
+def call_type_counts(chunks, normalize_call_types=False):
+    """Neighborhood x Initial Call Type counts of valid calls, one bincount per chunk.
+
+    Equal to `pd.crosstab` on the full frame (sorted rows and columns). Call types
+    are the raw strings unless `normalize_call_types`, which uses the decoded names.
+    """
+    rows, cols = {}, {}
+    counts = np.zeros((0, 0), dtype=np.int64)
+    for chunk in chunks:
+        chunk = spd_data.valid_calls(chunk)
+        call_types = chunk["Initial Call Type"]
+        if normalize_call_types:
+            call_types = vocabulary.decode_column(chunk, "Initial Call Type")
+        r, c = _global_codes(chunk["Neighborhood"], rows), _global_codes(call_types, cols)
+        keep = (r >= 0) & (c >= 0)
+        counts = np.pad(counts, ((0, len(rows) - counts.shape[0]), (0, len(cols) - counts.shape[1])))
+        flat = r[keep] * counts.shape[1] + c[keep]
+        counts += np.bincount(flat, minlength=counts.size).reshape(counts.shape)
+    matrix = pd.DataFrame(counts, index=pd.Index(list(rows), name="Neighborhood"),
+                          columns=pd.Index(list(cols), name="Initial Call Type"))
+    return matrix.sort_index().sort_index(axis=1)
+
+
+def call_type_matrix(source=spd_data.MERGED_DATA_PATH, normalize_call_types=False, chunk_rows=spd_data.CHUNK_ROWS):
+    """Streaming replacement for `pd.crosstab(df['Neighborhood'], df['Initial Call Type'])`."""
+    return call_type_counts(read_calls(source, USECOLS, chunk_rows), normalize_call_types)
+
+
+# === SUMMARIES FROM THE MATRIX ===
+def top_strings(counts, k=TOP_K):
+    """', '-joined names of the k largest columns per row (ties in column order, zeros skipped)."""
+    values = counts.to_numpy()
+    order = np.argsort(-values, axis=1, kind="stable")[:, :k]
+    names = counts.columns.to_numpy(dtype=object)
+    return pd.Series([", ".join(names[o][values[i, o] > 0]) for i, o in enumerate(order)],
+                     index=counts.index, name="Top Call Types")
+
+
+def cluster_labels(clusters, label_col):
+    """Normalized neighborhood name -> cluster label from a cluster label table."""
+    names = clusters["Neighborhood"].astype(str).str.lower().str.strip()
+    return pd.Series(clusters[label_col].to_numpy(), index=names, name=label_col)
+
+
+def cluster_summary(matrix, clusters, label_col, k=TOP_K):
+    """Neighborhoods, mean calls per neighborhood and top call types per cluster, from the count matrix."""
+    labels = matrix.index.to_series().map(cluster_labels(clusters, label_col))
+    labeled = labels.notna().to_numpy()
+    counts = matrix[labeled]
+    labels = labels[labeled].astype(clusters[label_col].dtype).rename(label_col)
+    totals = counts.sum(axis=1)
+    summary = pd.DataFrame({
+        "Neighborhoods": totals.groupby(labels).size(),
+        "Avg Calls per Neighborhood": totals.groupby(labels).mean(),
+    })
+    summary["Top Call Types"] = top_strings(counts.groupby(labels).sum(), k)
+    return summary.reset_index()
+
+
+# === SECOND PASS: LABELED CALLS ===
+def label_chunks(chunks, clusters, label_col):
+    """Yield each chunk's calls that have a cluster, with `label_col` added (an inner join per chunk)."""
+    labels = cluster_labels(clusters, label_col)
+    for chunk in chunks:
+        chunk = chunk.assign(**{label_col: chunk["Neighborhood"].map(labels)})
+        yield chunk[chunk[label_col].notna()].astype({label_col: labels.dtype})
+
+
+def write_labeled(chunks, clusters, label_col, output):
+    """Append labeled chunks to `output` as they arrive; returns the number of calls written."""
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    written = 0
+    for chunk in label_chunks(chunks, clusters, label_col):
+        chunk.to_csv(output, mode="w" if written == 0 else "a", header=written == 0, index=False)
+        written += len(chunk)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chunked call-type matrix and cluster labeling for large data.")
+    parser.add_argument("--source", default=spd_data.MERGED_DATA_PATH,
+                        help="merged CSV, or the partitioned store directory")
+    parser.add_argument("--chunk-rows", type=int, default=spd_data.CHUNK_ROWS)
+    sub = parser.add_subparsers(dest="command", required=True)
+    matrix_parser = sub.add_parser("matrix", help="stream the neighborhood x call-type count matrix to a CSV")
+    matrix_parser.add_argument("--normalize", action="store_true", help="use normalized call-type names")
+    matrix_parser.add_argument("--output", default=MATRIX_PATH)
+    label = sub.add_parser("label", help="write the calls with a cluster label attached")
+    label.add_argument("clusters", choices=list(top_call_types.CLUSTER_SOURCES))
+    label.add_argument("--output", required=True)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.command == "matrix":
+        matrix = call_type_matrix(args.source, args.normalize, args.chunk_rows)
+        os.makedirs(os.path.dirname(args.output), exist_ok=True)
+        matrix.to_csv(args.output)
+        print(f"✅ {matrix.shape[0]} neighborhoods x {matrix.shape[1]} call types ({int(matrix.to_numpy().sum()):,} "
+              f"calls) counted in {time.perf_counter() - start:.1f}s; saved to {args.output}")
+    else:
+        path, label_col = top_call_types.CLUSTER_SOURCES[args.clusters]
+        written = write_labeled(read_calls(args.source, chunk_rows=args.chunk_rows), pd.read_csv(path),
+                                label_col, args.output)
+        print(f"✅ {written:,} calls labeled with {label_col} in {time.perf_counter() - start:.1f}s; "
+              f"saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+
+import argparse
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+import spd_data
+import vocabulary
+from vocabulary import Vocabulary
+
+# === CONFIG ===
+STORE_DIR = "data/processed/calls_store"
+STATS_FILE = "_partitions.json"
+NEIGHBORHOOD_CODE_COL = vocabulary.CODE_COLUMNS["Dispatch Neighborhood"]
+# Calls whose timestamp did not parse; Hive readers (DuckDB, pyarrow) read this as NULL year/month
+NULL_PARTITION = "year=__HIVE_DEFAULT_PARTITION__/month=__HIVE_DEFAULT_PARTITION__"
+
+
+# === WRITING ===
+def store_schema(df):
+    """Column -> dtype that every file of a store is written with, derived from its first chunk.
+
+    Numbers are stored as float64 so a later chunk with gaps or decimals still fits;
+    anything else, including columns that are still all null, is stored as strings.
+    """
+    schema = {}
+    for col in df.columns:
+        if col in vocabulary.CODE_DTYPES:
+            schema[col] = str(np.dtype(vocabulary.CODE_DTYPE))
+        elif col == spd_data.TIMESTAMP_COL:
+            schema[col] = "datetime64[ns]"
+        elif (pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col])
+              and df[col].notna().any()):
+            schema[col] = "float64"
+        else:
+            schema[col] = "string"
+    return schema
+
+
+def _conform(df, schema):
+    """Cast `df` to the store schema so every Parquet file has the same column types."""
+    extra = set(df.columns) - set(schema)
+    if extra:
+        raise ValueError(f"Columns {sorted(extra)} are not in the store schema; rebuild the store to add them")
+    columns = {}
+    for col, dtype in schema.items():
+        values = df[col] if col in df.columns else pd.Series(None, index=df.index, dtype=object)
+        if dtype == "float64":
+            numbers = pd.to_numeric(values, errors="coerce")
+            if (numbers.isna() & values.notna()).any():
+                raise ValueError(f"Column {col!r} is numeric in the store but this data has text in it")
+            values = numbers
+        columns[col] = values.astype(dtype)
+    return pd.DataFrame(columns, index=df.index)
+
+
+def _read_meta(store_dir):
+    path = os.path.join(store_dir, STATS_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def read_stats(store_dir=STORE_DIR):
+    return _read_meta(store_dir).get("partitions", [])
+
+
+def read_schema(store_dir=STORE_DIR):
+    return _read_meta(store_dir).get("schema")
+
+
+def _write_stats(entries, schema, store_dir):
+    entries = sorted(entries, key=lambda e: e["path"])
+    with open(os.path.join(store_dir, STATS_FILE), "w") as f:
+        json.dump({"timestamp_column": spd_data.TIMESTAMP_COL, "schema": schema, "partitions": entries}, f,
+                  indent=1)
+
+
+def _stats_entry(part, rel_path, year, month):
+    times = part[spd_data.TIMESTAMP_COL]
+    codes = part[NEIGHBORHOOD_CODE_COL].dropna().unique() if NEIGHBORHOOD_CODE_COL in part else []
+    return {
+        "path": rel_path,
+        "year": year,
+        "month": month,
+        "rows": len(part),
+        "min_time": None if times.isna().all() else times.min().isoformat(),
+        "max_time": None if times.isna().all() else times.max().isoformat(),
+        "neighborhood_codes": sorted(int(c) for c in codes),
+    }
+
+
+def write_partitions(df, store_dir=STORE_DIR, stats=None):
+    """Append `df` to the store as one Parquet file per year/month, returning the updated stats.
+
+    Each file gets a stats entry (row count, timestamp min/max and the neighborhood
+    codes it contains) that the loader uses to skip files without opening them.
+    Calls whose time does not parse go to NULL_PARTITION (a Hive null year/month),
+    so the store holds every row of the CSV; only loads without a time range read them.
+    The first write fixes the store's column types and later writes are cast to them.
+    """
+    stats = list(read_stats(store_dir) if stats is None else stats)
+    ts = pd.to_datetime(df[spd_data.TIMESTAMP_COL], errors="coerce", format="ISO8601")
+    df = df.assign(**{spd_data.TIMESTAMP_COL: ts})
+    schema = (read_schema(store_dir) if stats else None) or store_schema(df)
+    df = _conform(df, schema)
+    existing = {}
+    for entry in stats:
+        existing[os.path.dirname(entry["path"])] = existing.get(os.path.dirname(entry["path"]), 0) + 1
+
+    parsed = ts.notna().to_numpy()
+    groups = [((int(year), int(month)), part) for (year, month), part in
+              df[parsed].groupby([ts[parsed].dt.year, ts[parsed].dt.month], sort=True)]
+    if not parsed.all():
+        groups.append(((None, None), df[~parsed]))
+
+    for (year, month), part in groups:
+        partition = NULL_PARTITION if year is None else f"year={year}/month={month:02d}"
+        number = existing.get(partition, 0)
+        existing[partition] = number + 1
+        rel_path = f"{partition}/part-{number:05d}.parquet"
+        os.makedirs(os.path.join(store_dir, partition), exist_ok=True)
+        part = part.sort_values(spd_data.TIMESTAMP_COL, kind="stable")
+        part.to_parquet(os.path.join(store_dir, rel_path), index=False, row_group_size=100_000)
+        stats.append(_stats_entry(part, rel_path, year, month))
+    _write_stats(stats, schema, store_dir)
+    return stats
+
+
+def write_store(df, store_dir=STORE_DIR):
+    """Replace the store with the contents of `df`."""
+    shutil.rmtree(store_dir, ignore_errors=True)
+    os.makedirs(store_dir, exist_ok=True)
+    return write_partitions(df, store_dir, stats=[])
+
+
+def build_from_csv(path=spd_data.MERGED_DATA_PATH, store_dir=STORE_DIR, append=False,
+                   chunk_rows=spd_data.CHUNK_ROWS):
+    """Convert a merged CSV into the store chunk by chunk (memory stays at one chunk)."""
+    if not append:
+        shutil.rmtree(store_dir, ignore_errors=True)
+    os.makedirs(store_dir, exist_ok=True)
+    stats = read_stats(store_dir)
+    for chunk in pd.read_csv(path, dtype=vocabulary.CODE_DTYPES, chunksize=chunk_rows, low_memory=False):
+        stats = write_partitions(chunk, store_dir, stats)
+    return stats
+
+
+# === READING ===
+def _timestamp(value):
+    return None if value is None else pd.Timestamp(value)
+
+
+def neighborhood_codes(neighborhoods, vocab=None):
+    """Vocabulary codes for neighborhood names (normalized); unknown names are dropped."""
+    vocab = vocab or Vocabulary.load()
+    index = vocab.index["Dispatch Neighborhood"]
+    return sorted({index[n] for n in (str(name).lower().strip() for name in neighborhoods) if n in index})
+
+
+def select_partitions(start=None, end=None, codes=None, store_dir=STORE_DIR):
+    """Stats entries whose time range overlaps [start, end) and that contain any of `codes`."""
+    start, end = _timestamp(start), _timestamp(end)
+    selected = []
+    for entry in read_stats(store_dir):
+        if entry["min_time"] is None and (start is not None or end is not None):
+            continue  # unparseable times never fall inside a range
+        if start is not None and pd.Timestamp(entry["max_time"]) < start:
+            continue
+        if end is not None and pd.Timestamp(entry["min_time"]) >= end:
+            continue
+        if codes is not None and not set(codes) & set(entry["neighborhood_codes"]):
+            continue
+        selected.append(entry)
+    return selected
+
+
+def load_calls(start=None, end=None, neighborhoods=None, columns=None, store_dir=STORE_DIR):
+    """Calls queued in [start, end), optionally only in `neighborhoods`, with the `Neighborhood` column.
+
+    Files are chosen from the partition stats, then the timestamp and neighborhood
+    filters are pushed into the Parquet reader so row groups outside them are skipped.
+    """
+    codes = None if neighborhoods is None else neighborhood_codes(neighborhoods)
+    entries = select_partitions(start, end, codes, store_dir)
+
+    filters = []
+    if start is not None:
+        filters.append((spd_data.TIMESTAMP_COL, ">=", _timestamp(start)))
+    if end is not None:
+        filters.append((spd_data.TIMESTAMP_COL, "<", _timestamp(end)))
+    if codes is not None:
+        filters.append((NEIGHBORHOOD_CODE_COL, "in", codes))
+    if columns is not None:
+        columns = list(dict.fromkeys(list(columns) + list(vocabulary.CODE_COLUMNS.values())))
+
+    frames = [pd.read_parquet(os.path.join(store_dir, entry["path"]), columns=columns, filters=filters or None)
+              for entry in entries]
+    if not frames:
+        # Typed empty frame: object-dtype code columns would break the decode below
+        columns = columns or [spd_data.TIMESTAMP_COL, "Dispatch Neighborhood", *vocabulary.CODE_COLUMNS.values()]
+        dtypes = {**vocabulary.CODE_DTYPES, spd_data.TIMESTAMP_COL: "datetime64[ns]"}
+        df = pd.DataFrame({col: pd.Series(dtype=dtypes.get(col, object)) for col in columns})
+    else:
+        df = pd.concat(frames, ignore_index=True)
+    df['Neighborhood'] = vocabulary.decode_column(df, 'Dispatch Neighborhood')
+    return df
+
+
+def read_chunks(columns=None, chunk_rows=spd_data.CHUNK_ROWS, store_dir=STORE_DIR):
+    """Stream the whole store in record batches, each with the normalized `Neighborhood` column."""
+    import pyarrow.parquet as pq
+
+    for entry in read_stats(store_dir):
+        parquet = pq.ParquetFile(os.path.join(store_dir, entry["path"]))
+        wanted = None
+        if columns is not None:
+            wanted = [c for c in dict.fromkeys(list(columns) + list(vocabulary.CODE_COLUMNS.values()))
+                      if c in parquet.schema_arrow.names]
+        for batch in parquet.iter_batches(batch_size=chunk_rows, columns=wanted):
+            chunk = batch.to_pandas()
+            chunk['Neighborhood'] = vocabulary.decode_column(chunk, 'Dispatch Neighborhood')
+            yield chunk
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hive-style year/month Parquet store of the merged calls.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="convert the merged CSV into the partitioned store")
+    build.add_argument("--input", default=spd_data.MERGED_DATA_PATH)
+    build.add_argument("--append", action="store_true", help="add the input as new files instead of rebuilding")
+    sub.add_parser("info", help="list partitions and their stats")
+    query = sub.add_parser("query", help="load a time range and report what was read")
+    query.add_argument("--start")
+    query.add_argument("--end", help="exclusive")
+    query.add_argument("--neighborhood", action="append", help="repeatable")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        start = time.perf_counter()
+        stats = build_from_csv(args.input, append=args.append)
+        print(f"✅ {sum(e['rows'] for e in stats):,} calls in {len(stats)} files under {STORE_DIR} "
+              f"({time.perf_counter() - start:.1f}s)")
+    elif args.command == "info":
+        stats = pd.DataFrame(read_stats())
+        print(stats[["path", "rows", "min_time", "max_time"]].to_string(index=False))
+    else:
+        start = time.perf_counter()
+        codes = None if args.neighborhood is None else neighborhood_codes(args.neighborhood)
+        entries = select_partitions(args.start, args.end, codes)
+        df = load_calls(args.start, args.end, args.neighborhood)
+        total = read_stats()
+        print(f"📊 Read {len(entries)}/{len(total)} files "
+              f"({sum(e['rows'] for e in entries):,}/{sum(e['rows'] for e in total):,} rows scanned), "
+              f"{len(df):,} calls matched in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import shapely
+from scipy import sparse
+
+import spd_data
+
+# === CONFIG ===
+EQUAL_AREA_CRS = 5070  # NAD83 / Conus Albers: overlap areas and densities in true km²
+WEIGHTS_PATH = "data/processed/population_weights.npz"
+WEIGHTS_META_PATH = "data/processed/population_weights.json"
+POPULATION_COL = "TOTAL_POPULATION"
+POPULATION_NAME_COL = "NEIGH_NAME"
+
+
+def overlay_weights(target_geoms, source_geoms):
+    """Sparse (n_target, n_source) matrix of the share of each source polygon's area inside each target.
+
+    Candidate pairs come from an STRtree query, so only bounding-box neighbours are
+    intersected. `W @ source_values` apportions any additive source quantity.
+    """
+    source_geoms = np.asarray(source_geoms, dtype=object)
+    target_geoms = np.asarray(target_geoms, dtype=object)
+    tree = shapely.STRtree(source_geoms)
+    target_idx, source_idx = tree.query(target_geoms, predicate="intersects")
+    overlap = shapely.area(shapely.intersection(target_geoms[target_idx], source_geoms[source_idx]))
+    source_area = shapely.area(source_geoms)
+    share = np.divide(overlap, source_area[source_idx], out=np.zeros_like(overlap),
+                      where=source_area[source_idx] > 0)
+    keep = share > 0
+    return sparse.csr_matrix((share[keep], (target_idx[keep], source_idx[keep])),
+                             shape=(len(target_geoms), len(source_geoms)))
+
+
+def build_weights(neighborhoods_path=spd_data.NEIGHBORHOODS_GEOJSON, population_path=spd_data.POPULATION_GEOJSON):
+    """Overlay SPD dispatch neighborhoods with census neighborhoods and cache the weights."""
+    import geopandas as gpd
+
+    target = spd_data.load_neighborhoods(neighborhoods_path).to_crs(epsg=EQUAL_AREA_CRS)
+    source = gpd.read_file(population_path).to_crs(epsg=EQUAL_AREA_CRS)
+    weights = overlay_weights(target.geometry.values, source.geometry.values)
+
+    os.makedirs(os.path.dirname(WEIGHTS_PATH), exist_ok=True)
+    sparse.save_npz(WEIGHTS_PATH, weights)
+    meta = {
+        "inputs": {path: spd_data.data_hash(path) for path in (neighborhoods_path, population_path)},
+        "crs": EQUAL_AREA_CRS,
+        "neighborhoods": target["Neighborhood"].tolist(),
+        "neighborhood_area_km2": (target.geometry.area / 1e6).round(6).tolist(),
+        "source_names": source[POPULATION_NAME_COL].astype(str).tolist(),
+    }
+    with open(WEIGHTS_META_PATH, "w") as f:
+        json.dump(meta, f)
+    return weights, meta
+
+
+def load_weights(neighborhoods_path=spd_data.NEIGHBORHOODS_GEOJSON, population_path=spd_data.POPULATION_GEOJSON,
+                 rebuild=False):
+    """Cached overlay weights, rebuilt when either polygon file changed."""
+    if not rebuild and os.path.exists(WEIGHTS_PATH) and os.path.exists(WEIGHTS_META_PATH):
+        with open(WEIGHTS_META_PATH) as f:
+            meta = json.load(f)
+        inputs = {path: spd_data.data_hash(path) for path in (neighborhoods_path, population_path)}
+        if meta["inputs"] == inputs and meta["crs"] == EQUAL_AREA_CRS:
+            return sparse.load_npz(WEIGHTS_PATH), meta
+    return build_weights(neighborhoods_path, population_path)
+
+
+def source_values(population_path=spd_data.POPULATION_GEOJSON, column=POPULATION_COL):
+    """Census attribute as a vector in the row order of the population file (missing -> 0)."""
+    import geopandas as gpd
+
+    values = gpd.read_file(population_path, columns=[column], ignore_geometry=True)[column]
+    return pd.to_numeric(values, errors="coerce").fillna(0).to_numpy(dtype=float)
+
+
+def neighborhood_population(neighborhoods_path=spd_data.NEIGHBORHOODS_GEOJSON,
+                            population_path=spd_data.POPULATION_GEOJSON):
+    """Area-weighted population, equal-area km² and density per SPD dispatch neighborhood."""
+    weights, meta = load_weights(neighborhoods_path, population_path)
+    population = weights @ source_values(population_path)
+    per_polygon = pd.DataFrame({
+        "Neighborhood": meta["neighborhoods"],
+        POPULATION_COL: population,
+        "area_km2": meta["neighborhood_area_km2"],
+    })
+    result = per_polygon.groupby("Neighborhood", sort=False, as_index=False).sum()
+    result[POPULATION_COL] = result[POPULATION_COL].round().astype(int)
+    result["population_density"] = (result[POPULATION_COL] / result["area_km2"]).round(1)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Areal-weighted census population per SPD dispatch neighborhood.")
+    parser.add_argument("--rebuild", action="store_true", help="recompute the overlay weights even if cached")
+    parser.add_argument("--output", default="output/neighborhood_population.csv")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    weights, meta = load_weights(rebuild=args.rebuild)
+    print(f"✅ {weights.shape[0]} x {weights.shape[1]} overlay weights ({weights.nnz} overlaps) "
+          f"ready in {time.perf_counter() - start:.2f}s; cached at {WEIGHTS_PATH}")
+
+    result = neighborhood_population()
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    result.to_csv(args.output, index=False)
+    covered = weights.sum(axis=0).A1
+    print(f"📊 {int(result[POPULATION_COL].sum()):,} people apportioned to {len(result)} neighborhoods; "
+          f"{(covered < 0.99).sum()} census polygons extend past the SPD boundaries")
+    print(f"✅ Saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
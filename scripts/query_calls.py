@@ -0,0 +1,136 @@
+
+import argparse
+import os
+import time
+
+import duckdb
+
+import partitioned_store
+import spd_data
+
+# === CONFIG ===
+PARQUET_PATH = "data/processed/merged_spd_weather.parquet"
+RAINY_DAY_PRCP_MM = 1.0
+
+# Reusable version of the neighborhood normalization/filter every script repeats
+VALID_CALLS_VIEW = """
+CREATE OR REPLACE VIEW valid_calls AS
+SELECT *, lower(trim(CAST("Dispatch Neighborhood" AS VARCHAR))) AS "Neighborhood"
+FROM calls
+WHERE "Dispatch Neighborhood" IS NOT NULL
+  AND lower(trim(CAST("Dispatch Neighborhood" AS VARCHAR))) NOT IN ({invalid})
+"""
+
+# === CANNED QUERIES ===
+QUERIES = {
+    "calls_per_neighborhood_rainy_day": f"""
+        SELECT "Neighborhood",
+               count(*) AS calls,
+               count(DISTINCT date) AS rainy_days,
+               round(count(*) / count(DISTINCT date), 2) AS calls_per_rainy_day
+        FROM valid_calls
+        WHERE prcp >= {RAINY_DAY_PRCP_MM}
+        GROUP BY ALL
+        ORDER BY calls_per_rainy_day DESC
+    """,
+    "priority_mix_by_hour": """
+        PIVOT (
+            SELECT hour(CAST("CAD Event Original Time Queued" AS TIMESTAMP)) AS hour,
+                   CAST("Initial Call Priority" AS VARCHAR) AS priority
+            FROM valid_calls
+        )
+        ON priority
+        USING count(*)
+        ORDER BY hour
+    """,
+    "top_call_types": """
+        SELECT "Neighborhood", "Initial Call Type", count(*) AS calls
+        FROM valid_calls
+        GROUP BY "Neighborhood", "Initial Call Type"
+        QUALIFY row_number() OVER (PARTITION BY "Neighborhood" ORDER BY calls DESC) <= 3
+        ORDER BY "Neighborhood", calls DESC
+    """,
+}
+
+
+def source_relation(source):
+    """DuckDB table function for a CSV file, a Parquet file or a directory of Parquet files."""
+    if os.path.isdir(source):
+        return f"read_parquet('{source}/**/*.parquet', hive_partitioning = true)"
+    if source.endswith(".parquet"):
+        return f"read_parquet('{source}')"
+    return f"read_csv_auto('{source}', header = true)"
+
+
+def default_source():
+    for source in (partitioned_store.STORE_DIR, PARQUET_PATH):
+        if os.path.exists(source):
+            return source
+    return spd_data.MERGED_DATA_PATH
+
+
+def connect(source=None, threads=None):
+    """Open an in-memory DuckDB connection with `calls` and `valid_calls` views.
+
+    The views are lazy: DuckDB pushes projections and filters into the scan, so
+    queries only read the columns (and, for Parquet, the row groups) they need.
+    """
+    con = duckdb.connect()
+    if threads:
+        con.execute(f"SET threads = {int(threads)}")
+    con.execute(f"CREATE OR REPLACE VIEW calls AS SELECT * FROM {source_relation(source or default_source())}")
+    invalid = ", ".join(f"'{name}'" for name in spd_data.INVALID_NEIGHBORHOODS)
+    con.execute(VALID_CALLS_VIEW.format(invalid=invalid))
+    return con
+
+
+def query(sql, source=None, threads=None):
+    """Run one query against the call store and return a pandas DataFrame."""
+    con = connect(source, threads)
+    try:
+        return con.execute(QUERIES.get(sql, sql)).df()
+    finally:
+        con.close()
+
+
+def convert_to_parquet(source, target=PARQUET_PATH):
+    """Write the CSV store to Parquet once so later scans can skip columns and row groups."""
+    con = duckdb.connect()
+    try:
+        con.execute(f"COPY (SELECT * FROM {source_relation(source)}) TO '{target}' "
+                    "(FORMAT parquet, COMPRESSION zstd, ROW_GROUP_SIZE 122880)")
+    finally:
+        con.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ad hoc SQL over the processed call store.")
+    parser.add_argument("sql", nargs="?", help=f"SQL text or a canned query: {', '.join(QUERIES)}")
+    parser.add_argument("--source", help="CSV, Parquet file or partitioned Parquet directory")
+    parser.add_argument("--threads", type=int, help="DuckDB worker threads (default: all cores)")
+    parser.add_argument("--output", help="write the result to this CSV instead of printing it")
+    parser.add_argument("--to-parquet", action="store_true",
+                        help=f"convert the merged CSV to {PARQUET_PATH} and exit")
+    args = parser.parse_args(argv)
+
+    if args.to_parquet:
+        convert_to_parquet(args.source or spd_data.MERGED_DATA_PATH)
+        print(f"✅ Parquet store saved to {PARQUET_PATH}")
+        return
+    if not args.sql:
+        parser.error("a query is required")
+
+    start = time.perf_counter()
+    result = query(args.sql, args.source, args.threads)
+    elapsed = time.perf_counter() - start
+
+    if args.output:
+        result.to_csv(args.output, index=False)
+        print(f"✅ {len(result)} rows saved to {args.output}")
+    else:
+        print(result.to_string(index=False))
+    print(f"Query finished in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
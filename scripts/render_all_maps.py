@@ -0,0 +1,76 @@
+
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import generate_population_density_map
+import map_call_type_clusters
+import map_cluster_vs_priority_overlay
+import map_hdbscan_clusters
+import map_layers
+import map_pca_clusters_vs_priority
+import map_temporal_clusters
+import visualize_gmm_clusters
+
+# Shared inputs, loaded once in the parent and inherited by forked workers
+LAYERS = {}
+
+# name -> map module exposing build(layers), LAYERS (required inputs) and OUTPUT_MAP
+MAPS = {
+    "call_type_clusters": map_call_type_clusters,
+    "hdbscan_clusters": map_hdbscan_clusters,
+    "gmm_clusters": visualize_gmm_clusters,
+    "pca_vs_priority": map_pca_clusters_vs_priority,
+    "cluster_vs_priority": map_cluster_vs_priority_overlay,
+    "temporal_clusters": map_temporal_clusters,
+    "population_density": generate_population_density_map,
+}
+
+
+def render(name):
+    """Build, serialize and save one map from the shared layers."""
+    start = time.perf_counter()
+    module = MAPS[name]
+    map_layers.save(module.build(LAYERS), module.OUTPUT_MAP)
+    return name, module.OUTPUT_MAP, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render every folium map from one shared load of the inputs.")
+    parser.add_argument("maps", nargs="*", metavar="MAP",
+                        help=f"maps to render (default: all). Choices: {', '.join(MAPS)}")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="render worker processes")
+    args = parser.parse_args(argv)
+    unknown = set(args.maps) - set(MAPS)
+    if unknown:
+        parser.error(f"unknown maps: {', '.join(sorted(unknown))}")
+
+    start = time.perf_counter()
+    LAYERS.update(map_layers.load_layers(set().union(*(MAPS[name].LAYERS for name in args.maps or MAPS))))
+    print(f"Loaded shared layers in {time.perf_counter() - start:.2f}s")
+
+    selected = []
+    for name in args.maps or MAPS:
+        missing = map_layers.missing_layers(LAYERS, MAPS[name].LAYERS)
+        if missing:
+            print(f"⚠️ Skipping {name}: missing inputs {missing}")
+        else:
+            selected.append(name)
+
+    # Workers are forked so they inherit LAYERS without pickling GeoDataFrames
+    if args.workers > 1 and len(selected) > 1 and "fork" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("fork")
+        with ProcessPoolExecutor(max_workers=min(args.workers, len(selected)), mp_context=ctx) as pool:
+            results = list(pool.map(render, selected))
+    else:
+        results = [render(name) for name in selected]
+
+    for name, path, seconds in results:
+        print(f"✅ {name} map saved to {path} ({seconds:.2f}s)")
+    print(f"Rendered {len(results)} maps in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
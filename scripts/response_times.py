@@ -0,0 +1,161 @@
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import sketches
+import spd_data
+from sketches import QuantileSketch
+
+# === CONFIG ===
+DISPATCH_COL = "CAD Event First Dispatch Time"
+ARRIVED_COL = "CAD Event Arrived Time"
+RAW_TIME_FORMAT = "%m/%d/%Y %I:%M:%S %p"
+SKETCH_PATH = "models/response_time_sketches.pkl"
+OUTPUT_CSV = "output/response_time_quantiles.csv"
+MAX_MINUTES = 24 * 60  # deltas beyond a day are data-entry errors, not response times
+QUANTILES = (0.5, 0.9, 0.99)
+
+# Stage name -> (start column, end column)
+STAGES = {
+    "queue_to_dispatch": (spd_data.TIMESTAMP_COL, DISPATCH_COL),
+    "dispatch_to_arrival": (DISPATCH_COL, ARRIVED_COL),
+    "queue_to_arrival": (spd_data.TIMESTAMP_COL, ARRIVED_COL),
+}
+
+# Sketch name -> key columns (every sketch is also keyed by stage)
+DIMENSIONS = {
+    "overall": ["Scope"],
+    "neighborhood": ["Neighborhood"],
+    "priority": ["Priority"],
+    "call_type": ["Initial Call Type"],
+}
+
+USECOLS = [spd_data.TIMESTAMP_COL, DISPATCH_COL, ARRIVED_COL,
+           "Dispatch Neighborhood", "Initial Call Type", "Initial Call Priority"]
+
+
+def parse_times(series):
+    """Parse the raw SPD 12-hour format, falling back to ISO for already-normalized columns."""
+    parsed = pd.to_datetime(series, format=RAW_TIME_FORMAT, errors="coerce")
+    retry = parsed.isna() & series.notna()
+    if retry.any():
+        parsed[retry] = pd.to_datetime(series[retry], format="ISO8601", errors="coerce")
+    return parsed
+
+
+def stage_minutes(df):
+    """Long frame of (stage, minutes) per call with the key columns, dropping impossible deltas."""
+    times = {col: parse_times(df[col]) for col in {c for pair in STAGES.values() for c in pair}}
+    keys = pd.DataFrame({
+        "Scope": "all calls",
+        "Neighborhood": df["Neighborhood"],
+        "Priority": np.trunc(pd.to_numeric(df["Initial Call Priority"], errors="coerce")),
+        "Initial Call Type": df["Initial Call Type"].fillna("unknown"),
+    }, index=df.index)
+    keys["Priority"] = ("P" + keys["Priority"].astype("Int64").astype(str)).where(keys["Priority"].notna(), "unknown")
+
+    frames = []
+    for stage, (start, end) in STAGES.items():
+        minutes = (times[end] - times[start]) / pd.Timedelta(minutes=1)
+        ok = minutes.between(0, MAX_MINUTES).to_numpy()
+        frames.append(keys[ok].assign(stage=stage, minutes=minutes[ok].to_numpy()))
+    return pd.concat(frames, ignore_index=True)
+
+
+def chunk_sketches(df, compression=sketches.DEFAULT_COMPRESSION):
+    """One sketch per dimension for a chunk of calls."""
+    long = stage_minutes(df)
+    valid_neighborhood = ~long["Neighborhood"].isin(spd_data.INVALID_NEIGHBORHOODS)
+    result = {}
+    for name, key_cols in DIMENSIONS.items():
+        part = long[valid_neighborhood] if name == "neighborhood" else long
+        result[name] = QuantileSketch(key_cols + ["stage"], compression).update(part, "minutes")
+    return result
+
+
+def merge_all(target, other):
+    for name, sketch in other.items():
+        if name in target:
+            target[name].merge(sketch)
+        else:
+            target[name] = sketch
+    return target
+
+
+def build(path, workers=1, chunk_rows=spd_data.CHUNK_ROWS):
+    """Stream the CSV in chunks; sketch each chunk (optionally in worker processes) and merge."""
+    rows = 0
+
+    def counted(chunks):
+        nonlocal rows
+        for chunk in chunks:
+            rows += len(chunk)
+            yield chunk
+
+    chunks = counted(spd_data.read_chunks(path, USECOLS, chunk_rows))
+    return sketches.map_merge(chunks, chunk_sketches, merge_all, workers) or {}, rows
+
+
+def quantile_table(sketch_dict, qs=QUANTILES):
+    """Long table of dimension, key, stage, count and quantiles (minutes) for every sketch."""
+    tables = []
+    for name, sketch in sketch_dict.items():
+        table = sketch.quantiles(qs)
+        key_cols = [c for c in sketch.key_names if c != "stage"]
+        table.insert(0, "key", table[key_cols].astype(str).agg(" / ".join, axis=1))
+        table.insert(0, "dimension", name)
+        tables.append(table.drop(columns=key_cols))
+    result = pd.concat(tables, ignore_index=True)
+    quantile_cols = [c for c in result.columns if c.startswith("p")]
+    result[quantile_cols] = result[quantile_cols].round(2)
+    return result.sort_values(["dimension", "stage", "count"], ascending=[True, True, False])
+
+
+def write_report(sketch_dict):
+    table = quantile_table(sketch_dict)
+    os.makedirs(os.path.dirname(OUTPUT_CSV), exist_ok=True)
+    table.to_csv(OUTPUT_CSV, index=False)
+    print(f"✅ Response-time quantiles saved to {OUTPUT_CSV}")
+    print(table[table["dimension"] == "overall"].to_string(index=False))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Response-time quantiles from mergeable t-digest sketches.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_cmd = sub.add_parser("build", help="sketch a call CSV and save the sketches")
+    build_cmd.add_argument("--input", default=spd_data.MERGED_DATA_PATH)
+    build_cmd.add_argument("--append", action="store_true",
+                           help="merge into the saved sketches (e.g. a new day of calls) instead of replacing them")
+    build_cmd.add_argument("--workers", type=int, default=1)
+    build_cmd.add_argument("--chunk-rows", type=int, default=spd_data.CHUNK_ROWS)
+    merge_cmd = sub.add_parser("merge", help="merge sketch files (from other days or machines) into the saved one")
+    merge_cmd.add_argument("paths", nargs="+")
+    sub.add_parser("report", help="write the quantile table from the saved sketches")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        start = time.perf_counter()
+        result, rows = build(args.input, args.workers, args.chunk_rows)
+        if args.append and os.path.exists(SKETCH_PATH):
+            result = merge_all(sketches.load(SKETCH_PATH), result)
+        print(f"✅ Sketched {rows:,} calls in {time.perf_counter() - start:.1f}s")
+    elif args.command == "merge":
+        result = sketches.load(SKETCH_PATH) if os.path.exists(SKETCH_PATH) else {}
+        for path in args.paths:
+            merge_all(result, sketches.load(path))
+    else:
+        result = sketches.load(SKETCH_PATH)
+
+    if args.command != "report":
+        sketches.save(result, SKETCH_PATH)
+        centroids = sum(len(s.mean) for s in result.values())
+        print(f"📊 {centroids:,} centroids saved to {SKETCH_PATH}")
+    write_report(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+
+import argparse
+import os
+import runpy
+import time
+
+import numpy as np
+import pandas as pd
+import hdbscan
+
+import model_registry
+import vocabulary
+
+# === CONFIG ===
+MODEL_NAME = "hdbscan_call_types"
+OUTPUT_CSV = "output/neighborhood_hdbscan_scores.csv"
+DRIFT_THRESHOLD = 0.25
+CLUSTER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cluster_call_types_hdbscan.py")
+
+
+def build_profiles(df, model):
+    """Neighborhood x call-type counts for one period, aligned to the training columns.
+
+    A period covers far fewer calls than the full history the model was fit on, so
+    counts are rescaled to the training call volume before they are standardized.
+    """
+    df['Neighborhood'] = vocabulary.decode_column(df, 'Dispatch Neighborhood')
+    df = df[~df['Neighborhood'].isin(['-', 'unknown']) & df['Neighborhood'].notna()]
+
+    counts = (
+        df.groupby(['Neighborhood', 'Initial Call Type'])
+          .size()
+          .unstack(fill_value=0)
+    )
+    total_calls = counts.sum(axis=1)
+    profiles = model.align(counts)
+    scale = model.info["training_total_calls"] / max(total_calls.sum(), 1)
+    return profiles * scale, total_calls
+
+
+def score(profiles, model):
+    """Assign clusters to new profiles without refitting; returns labels, strengths and memberships."""
+    X_pca = model.transform(profiles.values)
+    labels, strengths = hdbscan.approximate_predict(model.estimator, X_pca)
+    memberships = hdbscan.membership_vector(model.estimator, X_pca)
+    return labels, strengths, np.atleast_2d(memberships)
+
+
+def drift_score(neighborhoods, labels, model):
+    """Share of neighborhoods seen at training time whose cluster changed (including to noise)."""
+    training = model.info["training_labels"]
+    known = [(n, label) for n, label in zip(neighborhoods, labels) if n in training]
+    if not known:
+        return 1.0
+    return sum(training[n] != label for n, label in known) / len(known)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a new period of calls against the saved HDBSCAN model.")
+    parser.add_argument("calls_csv", help="calls for the new period (raw or merged format)")
+    parser.add_argument("--threshold", type=float, default=DRIFT_THRESHOLD,
+                        help="drift share above which a full re-cluster is needed")
+    parser.add_argument("--refit", action="store_true",
+                        help="run the full HDBSCAN clustering when drift exceeds the threshold")
+    args = parser.parse_args(argv)
+
+    model = model_registry.load(MODEL_NAME)
+    df = pd.read_csv(args.calls_csv, dtype=vocabulary.CODE_DTYPES, low_memory=False)
+    profiles, total_calls = build_profiles(df, model)
+
+    start = time.perf_counter()
+    labels, strengths, memberships = score(profiles, model)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    scores = pd.DataFrame({
+        "Neighborhood": profiles.index,
+        "hdbscan_cluster": labels,
+        "strength": strengths.round(4),
+        "total_calls": total_calls.reindex(profiles.index).values,
+    })
+    for k in range(memberships.shape[1]):
+        scores[f"membership_{k}"] = memberships[:, k].round(4)
+
+    os.makedirs(os.path.dirname(OUTPUT_CSV), exist_ok=True)
+    scores.to_csv(OUTPUT_CSV, index=False)
+    print(f"✅ Scored {len(scores)} neighborhoods in {elapsed_ms:.1f} ms; saved to {OUTPUT_CSV}")
+
+    drift = drift_score(scores["Neighborhood"], labels, model)
+    print(f"Cluster drift vs. training: {drift:.1%} (threshold {args.threshold:.0%})")
+    if drift > args.threshold:
+        if args.refit:
+            print("Drift above threshold, running full HDBSCAN re-cluster...")
+            runpy.run_path(CLUSTER_SCRIPT, run_name="__main__")
+        else:
+            print("⚠️ Drift above threshold; rerun with --refit or run cluster_call_types_hdbscan.py")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+
+# === CONFIG ===
+DEFAULT_COMPRESSION = 200
+DEFAULT_CAPACITY = 64      # Space-Saving counters kept per key
+COUNT_MIN_WIDTH = 256      # power of two; per-key overestimate <= e / width * N with prob. 1 - e^-depth
+COUNT_MIN_DEPTH = 4
+_HASH_MULTIPLIERS = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9,
+                              0x85EBCA77C2B2AE63, 0x27D4EB2F165667C5, 0xFF51AFD7ED558CCD], dtype=np.uint64)
+
+
+def _k_scale(q, compression):
+    """t-digest k1 scale function: narrow centroids near the tails, wide near the median."""
+    return compression / (2 * np.pi) * np.arcsin(2 * np.clip(q, 0.0, 1.0) - 1)
+
+
+def _compress(group, mean, weight, compression):
+    """Merge weighted points into t-digest centroids for every group at once.
+
+    Points are sorted by (group, value); each point's centre quantile within its
+    group is mapped through the k1 scale, and points falling in the same unit
+    k-interval are merged. The work is a sort plus a few bincounts regardless of
+    how many groups there are.
+    """
+    if len(mean) == 0:
+        return group, mean, weight
+    order = np.lexsort((mean, group))
+    group, mean, weight = group[order], mean[order], weight[order]
+
+    starts = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+    lengths = np.diff(np.r_[starts, len(group)])
+    cum = np.cumsum(weight)
+    before_group = np.repeat(np.r_[0.0, cum[starts[1:] - 1]], lengths)
+    totals = np.repeat(np.add.reduceat(weight, starts), lengths)
+    q_center = (cum - before_group - weight / 2) / totals
+    bucket = np.floor(_k_scale(q_center, compression) - _k_scale(0.0, compression)).astype(np.int64)
+
+    # New centroid wherever the group or the k-bucket changes
+    boundary = np.r_[True, (group[1:] != group[:-1]) | (bucket[1:] != bucket[:-1])]
+    ids = np.cumsum(boundary) - 1
+    new_weight = np.bincount(ids, weights=weight)
+    new_mean = np.bincount(ids, weights=weight * mean) / new_weight
+    return group[boundary], new_mean, new_weight
+
+
+def quantile_column(q):
+    """Column name for quantile q with all of its decimals: 0.5 -> p50, 0.999 -> p99.9."""
+    return f"p{(Decimal(str(q)) * 100).normalize():f}"
+
+
+class _KeyedSketch:
+    """Keys (tuples of key-column values) mapped to dense group ids shared by the flat arrays."""
+
+    def __init__(self, key_names):
+        self.key_names = list(key_names)
+        self.keys = []
+        self.key_index = {}
+
+    def _grow(self, n_groups):
+        """Resize per-group arrays after new keys were added."""
+
+    def _group_ids(self, keys):
+        ids = np.empty(len(keys), dtype=np.int64)
+        for i, key in enumerate(keys):
+            if key not in self.key_index:
+                self.key_index[key] = len(self.keys)
+                self.keys.append(key)
+            ids[i] = self.key_index[key]
+        self._grow(len(self.keys))
+        return ids
+
+    def _frame_group_ids(self, frame):
+        """Group id for every row of `frame` from its key columns."""
+        codes, uniques = pd.MultiIndex.from_frame(frame[self.key_names]).factorize()
+        return self._group_ids(list(uniques))[codes]
+
+
+class QuantileSketch(_KeyedSketch):
+    """Mergeable t-digest quantile sketches for many keys, stored as flat centroid arrays.
+
+    `update` folds a chunk of raw values in, `merge` folds in another sketch (from
+    another chunk, day or process); both are one vectorized compression over all
+    keys. Memory is O(compression) centroids per key regardless of the row count.
+    """
+
+    def __init__(self, key_names, compression=DEFAULT_COMPRESSION):
+        super().__init__(key_names)
+        self.compression = compression
+        self.group = np.empty(0, dtype=np.int64)
+        self.mean = np.empty(0, dtype=np.float64)
+        self.weight = np.empty(0, dtype=np.float64)
+        self.min = np.empty(0, dtype=np.float64)
+        self.max = np.empty(0, dtype=np.float64)
+
+    def _grow(self, n_groups):
+        grow = n_groups - len(self.min)
+        if grow > 0:
+            self.min = np.r_[self.min, np.full(grow, np.inf)]
+            self.max = np.r_[self.max, np.full(grow, -np.inf)]
+
+    def _absorb(self, group, mean, weight):
+        np.minimum.at(self.min, group, mean)
+        np.maximum.at(self.max, group, mean)
+        self.group, self.mean, self.weight = _compress(
+            np.r_[self.group, group], np.r_[self.mean, mean], np.r_[self.weight, weight], self.compression)
+
+    def update(self, frame, value_col):
+        """Add the non-null values of `value_col`, keyed by the sketch's key columns."""
+        frame = frame[frame[value_col].notna()]
+        if frame.empty:
+            return self
+        group = self._frame_group_ids(frame)
+        values = frame[value_col].to_numpy(dtype=np.float64)
+        self._absorb(group, values, np.ones(len(values)))
+        return self
+
+    def merge(self, other):
+        """Fold another sketch over the same keys into this one."""
+        remap = self._group_ids(other.keys)
+        group = remap[other.group]
+        np.minimum.at(self.min, remap, other.min)
+        np.maximum.at(self.max, remap, other.max)
+        self.group, self.mean, self.weight = _compress(
+            np.r_[self.group, group], np.r_[self.mean, other.mean], np.r_[self.weight, other.weight],
+            self.compression)
+        return self
+
+    def quantiles(self, qs=(0.5, 0.9, 0.99)):
+        """DataFrame of key columns, count and the requested quantiles per key."""
+        starts = np.flatnonzero(np.r_[True, self.group[1:] != self.group[:-1]]) if len(self.group) else []
+        bounds = np.r_[starts, len(self.group)]
+        rows = []
+        for s, e in zip(bounds[:-1], bounds[1:]):
+            g = self.group[s]
+            w, m = self.weight[s:e], self.mean[s:e]
+            total = w.sum()
+            # Centroid centres sit at their cumulative mid-weight; the extremes pin both ends
+            positions = np.r_[0.0, np.cumsum(w) - w / 2, total]
+            values = np.r_[self.min[g], m, self.max[g]]
+            rows.append((*self.keys[g], int(total), *np.interp(np.asarray(qs) * total, positions, values)))
+        columns = self.key_names + ["count"] + [quantile_column(q) for q in qs]
+        return pd.DataFrame(rows, columns=columns)
+
+
+def _item_buckets(items, width, depth):
+    """(depth, n) Count-Min bucket per item: a stable 64-bit hash spread by multiply-shift per row."""
+    hashed = pd.util.hash_array(np.asarray(items, dtype=object))
+    shift = np.uint64(64 - int(np.log2(width)))
+    return np.stack([(hashed * _HASH_MULTIPLIERS[d]) >> shift for d in range(depth)]).astype(np.int64)
+
+
+class TopKSketch(_KeyedSketch):
+    """Mergeable heavy-hitter sketch: Space-Saving top-k counters plus a Count-Min table per key.
+
+    Space-Saving keeps at most `capacity` (item, count, error) counters per key;
+    counts never underestimate and `count - error` never overestimates. Any item
+    not kept has a true count <= the key's smallest counter (its `floor`), which is
+    what two summaries contribute for items they do not hold when merged. The
+    linear Count-Min table gives a second, independent upper bound, so reported
+    counts are the tighter of the two.
+    """
+
+    def __init__(self, key_names, capacity=DEFAULT_CAPACITY, width=COUNT_MIN_WIDTH, depth=COUNT_MIN_DEPTH):
+        super().__init__(key_names)
+        self.capacity, self.width, self.depth = capacity, width, depth
+        self.counters = pd.DataFrame({"group": pd.Series(dtype=np.int64), "item": pd.Series(dtype=object),
+                                      "count": pd.Series(dtype=np.int64), "error": pd.Series(dtype=np.int64)})
+        self.totals = np.zeros(0, dtype=np.int64)
+        self.count_min = np.zeros((0, depth, width), dtype=np.int64)
+
+    def _grow(self, n_groups):
+        grow = n_groups - len(self.totals)
+        if grow > 0:
+            self.totals = np.r_[self.totals, np.zeros(grow, dtype=np.int64)]
+            self.count_min = np.concatenate([self.count_min, np.zeros((grow, self.depth, self.width), np.int64)])
+
+    def floors(self, counters=None):
+        """Per-group bound on the count of any item without a counter (0 until a key fills up)."""
+        counters = self.counters if counters is None else counters
+        group = counters["group"].to_numpy()
+        size = np.bincount(group, minlength=len(self.keys))
+        smallest = np.zeros(len(self.keys), dtype=np.int64)
+        if len(group):
+            mins = counters.groupby("group")["count"].min()
+            smallest[mins.index.to_numpy()] = mins.to_numpy()
+        return np.where(size >= self.capacity, smallest, 0)
+
+    def _truncate(self, counters):
+        counters = counters.sort_values(["group", "count", "item"], ascending=[True, False, True])
+        keep = counters.groupby("group").cumcount().to_numpy() < self.capacity
+        return counters[keep].reset_index(drop=True)
+
+    def _sum_counters(self, stacked, floor_total):
+        """Sum member summaries per (group, item); each member adds its floor for items it lacks.
+
+        `stacked` holds every member's counters with that member's floor in a
+        `floor` column; `floor_total` is the sum of member floors per group.
+        """
+        stacked = stacked.assign(count=stacked["count"] - stacked["floor"], error=stacked["error"] - stacked["floor"])
+        merged = stacked.groupby(["group", "item"], sort=False)[["count", "error"]].sum().reset_index()
+        extra = floor_total[merged["group"].to_numpy()]
+        merged["count"] += extra
+        merged["error"] += extra
+        return self._truncate(merged)
+
+    def _combine(self, parts):
+        """Merge summaries given as (counters, floors) over the same group ids."""
+        stacked = pd.concat([c.assign(floor=floors[c["group"].to_numpy()]) for c, floors in parts],
+                            ignore_index=True)
+        return self._sum_counters(stacked, np.sum([floors for _, floors in parts], axis=0))
+
+    def _count_min_add(self, group, items, counts):
+        buckets = _item_buckets(items, self.width, self.depth)
+        for d in range(self.depth):
+            np.add.at(self.count_min[:, d, :], (group, buckets[d]), counts)
+
+    def update(self, frame, item_col):
+        """Count the items of `item_col` per key for one chunk of rows."""
+        frame = frame[frame[item_col].notna()]
+        if frame.empty:
+            return self
+        group = self._frame_group_ids(frame)
+        chunk = (pd.DataFrame({"group": group, "item": frame[item_col].to_numpy(dtype=object)})
+                 .groupby(["group", "item"], sort=False).size().rename("count").reset_index())
+        chunk["error"] = 0
+        self.totals += np.bincount(group, minlength=len(self.keys))
+        self._count_min_add(chunk["group"].to_numpy(), chunk["item"].to_numpy(), chunk["count"].to_numpy())
+        # An exact chunk count is a summary with floor 0
+        self.counters = self._combine([(self.counters, self.floors()),
+                                       (chunk, np.zeros(len(self.keys), dtype=np.int64))])
+        return self
+
+    def merge(self, other):
+        """Fold in a sketch over the same key columns (another chunk, worker or day)."""
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Count-Min tables must have the same width and depth to merge")
+        own_floors = self.floors()
+        remap = self._group_ids(other.keys)
+        other_floors = np.zeros(len(self.keys), dtype=np.int64)
+        other_floors[remap] = other.floors()
+        self.totals[remap] += other.totals
+        self.count_min[remap] += other.count_min
+        own_floors = np.r_[own_floors, np.zeros(len(self.keys) - len(own_floors), dtype=np.int64)]
+        self.counters = self._combine([(self.counters, own_floors),
+                                       (other.counters.assign(group=remap[other.counters["group"]]), other_floors)])
+        return self
+
+    def regroup(self, mapping, key_name):
+        """Merge keys into coarser groups, e.g. neighborhoods into clusters.
+
+        `mapping` maps an existing key (the bare value for single-column keys) to
+        its new label; keys mapped to None or missing are dropped.
+        """
+        target = TopKSketch([key_name], self.capacity, self.width, self.depth)
+        labels = [mapping.get(key[0] if len(key) == 1 else key) for key in self.keys]
+        keep = np.array([label is not None and label == label for label in labels], dtype=bool)
+        new_ids = np.full(len(self.keys), -1, dtype=np.int64)
+        new_ids[keep] = target._group_ids([(label,) for label, k in zip(labels, keep) if k])
+
+        floors = self.floors()
+        counters = self.counters[keep[self.counters["group"].to_numpy()]]
+        old_group = counters["group"].to_numpy()
+        stacked = counters.assign(group=new_ids[old_group], floor=floors[old_group])
+        floor_total = np.bincount(new_ids[keep], weights=floors[keep], minlength=len(target.keys)).astype(np.int64)
+        target.counters = target._sum_counters(stacked, floor_total)
+        target.totals = np.bincount(new_ids[keep], weights=self.totals[keep],
+                                    minlength=len(target.keys)).astype(np.int64)
+        np.add.at(target.count_min, new_ids[keep], self.count_min[keep])
+        return target
+
+    def top(self, k=3):
+        """Top-k items per key with count estimates and guaranteed bounds.
+
+        `count` is min(Space-Saving, Count-Min) and never underestimates; the true
+        count lies in [lower_bound, count]. `max_error` is the key's floor, which
+        is at most key_total / capacity.
+        """
+        counters = self.counters.copy()
+        group = counters["group"].to_numpy()
+        buckets = _item_buckets(counters["item"].to_numpy(), self.width, self.depth)
+        count_min = self.count_min[group[None, :], np.arange(self.depth)[:, None], buckets].min(axis=0)
+        counters["lower_bound"] = (counters["count"] - counters["error"]).clip(lower=0)
+        counters["count"] = np.minimum(counters["count"].to_numpy(), count_min)
+        counters = counters.sort_values(["group", "count", "item"], ascending=[True, False, True])
+        counters = counters[counters.groupby("group").cumcount().to_numpy() < k]
+        counters["rank"] = counters.groupby("group").cumcount() + 1
+        counters["key_total"] = self.totals[counters["group"].to_numpy()]
+        counters["max_error"] = self.floors()[counters["group"].to_numpy()]
+
+        keys = pd.DataFrame([self.keys[g] for g in counters["group"]], columns=self.key_names, index=counters.index)
+        return pd.concat([keys, counters.drop(columns="group")], axis=1)[
+            self.key_names + ["rank", "item", "count", "lower_bound", "max_error", "key_total"]]
+
+    def top_strings(self, k=3):
+        """Comma-joined top-k items per key (indexed by the bare key for single-column keys)."""
+        top = self.top(k)
+        index = self.key_names[0] if len(self.key_names) == 1 else self.key_names
+        return top.groupby(index, sort=False)["item"].agg(", ".join)
+
+
+def map_merge(chunks, sketch_chunk, merge, workers=1):
+    """Sketch every chunk (in worker processes when workers > 1) and merge the results in order.
+
+    Only about two chunks per worker are in flight at once, so memory stays bounded
+    however long the input is.
+    """
+    result = None
+    if workers <= 1:
+        for chunk in chunks:
+            part = sketch_chunk(chunk)
+            result = part if result is None else merge(result, part)
+        return result
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        for chunk in chunks:
+            pending.append(pool.submit(sketch_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                part = pending.pop(0).result()
+                result = part if result is None else merge(result, part)
+        for future in pending:
+            part = future.result()
+            result = part if result is None else merge(result, part)
+    return result
+
+
+def save(sketches, path):
+    """Pickle a sketch (or a dict of sketches) so later runs can merge into it."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as f:
+        pickle.dump(sketches, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
@@ -0,0 +1,131 @@
+
+"""Single entry point for the project pipeline.
+
+    python scripts/spd.py merge + cluster kmeans + summarize call-types + map all --workers 4
+
+Steps separated by "+" run in one interpreter, so pandas, geopandas, sklearn and
+friends are imported once for the whole chain. Nothing heavy is imported until a
+step runs, so `--help` and the command listing start instantly.
+"""
+
+import os
+import runpy
+import sys
+import time
+from importlib import import_module
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+CHAIN_SEPARATOR = "+"
+
+# group -> {command: (target, help)}; "name.py" runs a standalone script, "name" calls module.main(argv).
+# The merge and weather groups have a single command, run as e.g. `spd.py merge`.
+COMMANDS = {
+    "merge": {
+        "": ("merge_datasets.py", "merge SPD calls with daily weather and encode names"),
+    },
+    "weather": {
+        "": ("station_weather", "fetch/build per-neighborhood hourly weather from nearby stations"),
+    },
+    "cluster": {
+        "gmm": ("cluster_with_gmm.py", "GMM on PCA of the call-type matrix"),
+        "gmm-bic": ("cluster_with_gmm_bic.py", "GMM with the component count chosen by BIC"),
+        "hdbscan": ("cluster_call_types_hdbscan.py", "HDBSCAN on PCA of the call-type matrix"),
+        "pca": ("cluster_with_pca_agglomerative.py", "agglomerative clustering of call-type shares"),
+        "kmeans": ("generate_interactive_map_with_call_type_clusters.py", "KMeans call-type clusters and map"),
+        "temporal": ("cluster_temporal_profiles", "cluster neighborhoods or beats by time-of-day profile"),
+        "score-hdbscan": ("score_hdbscan_clusters", "score a new period against the registered HDBSCAN model"),
+        "stability": ("cluster_stability", "bootstrap stability of any clustering"),
+        "registry": ("model_registry", "list or score registered clustering pipelines"),
+        "tune-classifier": ("tune_call_type_classifier", "successive-halving search for the call-type classifier"),
+    },
+    "summarize": {
+        "call-types": ("summarize_call_type_clusters.py", "summary of the KMeans call-type clusters (after `cluster kmeans`)"),
+        "pca": ("summarize_pca_clusters.py", "summary of the PCA/agglomerative clusters"),
+        "hdbscan-outliers": ("summarize_hdbscan_outliers.py", "calls in HDBSCAN noise neighborhoods"),
+        "top-call-types": ("top_call_types", "streaming top call types per neighborhood and cluster"),
+        "response-times": ("response_times", "queue/dispatch/arrival quantiles from sketches"),
+        "weather": ("weather_correlation", "call x weather x lag correlations"),
+        "population": ("population_overlay", "areal-weighted population per neighborhood"),
+        "out-of-core": ("out_of_core", "chunked call-type matrix and labeled calls for data larger than RAM"),
+        "query": ("query_calls", "canned DuckDB queries over the merged data"),
+    },
+    "map": {
+        "all": ("render_all_maps", "render every folium map from one shared load"),
+        "overview": ("generate_interactive_map.py", "call volume, top call types and priority heatmap"),
+        "population": ("generate_population_density_map", "population density map"),
+        "hotspots": ("hotspot_kde", "FFT kernel-density hotspots"),
+        "gmm": ("visualize_gmm_clusters", "choropleth of the BIC-selected GMM clusters"),
+    },
+}
+
+
+def usage():
+    lines = [__doc__.strip(), "", "Commands:"]
+    for group, commands in COMMANDS.items():
+        for name, (_, text) in commands.items():
+            lines.append(f"  {(group + ' ' + name).strip():<28} {text}")
+    lines += ["", "Arguments after a command are passed to it, e.g. `map all --workers 4`;",
+              "module commands accept -h for their own options."]
+    return "\n".join(lines)
+
+
+def split_chain(argv):
+    steps, current = [], []
+    for arg in argv:
+        if arg == CHAIN_SEPARATOR:
+            steps.append(current)
+            current = []
+        else:
+            current.append(arg)
+    steps.append(current)
+    return [step for step in steps if step]
+
+
+def resolve(step):
+    """(label, target, remaining args) for one step, or raise SystemExit with a helpful message."""
+    group, rest = step[0], step[1:]
+    if group not in COMMANDS:
+        sys.exit(f"Unknown command {group!r}.\n\n{usage()}")
+    commands = COMMANDS[group]
+    if "" in commands:
+        return group, commands[""][0], rest
+    if not rest or rest[0] not in commands:
+        sys.exit(f"`{group}` needs one of: {', '.join(commands)}")
+    return f"{group} {rest[0]}", commands[rest[0]][0], rest[1:]
+
+
+def run(target, args):
+    if target.endswith(".py"):
+        # Standalone scripts read sys.argv and do their work at import time
+        saved = sys.argv
+        sys.argv = [target] + args
+        try:
+            runpy.run_path(os.path.join(SCRIPTS_DIR, target), run_name="__main__")
+        finally:
+            sys.argv = saved
+    else:
+        import_module(target).main(args)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return
+
+    steps = [resolve(step) for step in split_chain(argv)]
+    if SCRIPTS_DIR not in sys.path:
+        sys.path.insert(0, SCRIPTS_DIR)
+
+    total = time.perf_counter()
+    for label, target, args in steps:
+        start = time.perf_counter()
+        print(f"▶️ {label}")
+        run(target, args)
+        print(f"⏱️ {label} finished in {time.perf_counter() - start:.1f}s")
+    if len(steps) > 1:
+        print(f"✅ {len(steps)} steps finished in {time.perf_counter() - total:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
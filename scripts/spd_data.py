@@ -0,0 +1,101 @@
+
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+import vocabulary
+
+# === PATHS ===
+MERGED_DATA_PATH = "data/processed/merged_spd_weather.csv"
+NEIGHBORHOODS_GEOJSON = "data/raw/spd_dispatch_neighborhoods.geojson"
+POPULATION_GEOJSON = "data/raw/hh_population_types_Neighborhoods_5617280960769611352.geojson"
+OUTPUT_DIR = "output"
+
+# === COLUMNS ===
+TIMESTAMP_COL = "CAD Event Original Time Queued"
+LATITUDE_COL = "Latitude"
+LONGITUDE_COL = "Longitude"
+
+# === SHARED SETTINGS ===
+SEATTLE_CENTER = [47.6, -122.33]
+# (south, west, north, east) box used to drop masked or out-of-city coordinates
+SEATTLE_BOUNDS = (47.48, -122.46, 47.75, -122.22)
+INVALID_NEIGHBORHOODS = ['-', 'unknown']
+# Local equirectangular projection around the city center (meters per degree)
+M_PER_DEG_LAT = 110_540
+M_PER_DEG_LON = 111_320 * np.cos(np.radians(SEATTLE_CENTER[0]))
+CHUNK_ROWS = 250_000
+
+
+def _with_code_columns(usecols):
+    """Also pick up the integer code columns when the processed data has them."""
+    if usecols is None:
+        return None
+    wanted = set(usecols) | set(vocabulary.CODE_COLUMNS.values())
+    return wanted.__contains__
+
+
+def load_calls(path=MERGED_DATA_PATH, usecols=None):
+    """Load the merged call data and add the normalized `Neighborhood` column."""
+    df = pd.read_csv(path, usecols=_with_code_columns(usecols), dtype=vocabulary.CODE_DTYPES, low_memory=False)
+    df['Neighborhood'] = vocabulary.decode_column(df, 'Dispatch Neighborhood')
+    return df
+
+
+def read_chunks(path=MERGED_DATA_PATH, usecols=None, chunk_rows=CHUNK_ROWS):
+    """Stream the merged call data in chunks, each with the normalized `Neighborhood` column."""
+    chunks = pd.read_csv(path, usecols=_with_code_columns(usecols), dtype=vocabulary.CODE_DTYPES,
+                         chunksize=chunk_rows, low_memory=False)
+    for chunk in chunks:
+        chunk['Neighborhood'] = vocabulary.decode_column(chunk, 'Dispatch Neighborhood')
+        yield chunk
+
+
+def valid_calls(df):
+    """Drop calls without a usable dispatch neighborhood."""
+    return df[~df['Neighborhood'].isin(INVALID_NEIGHBORHOODS) & df['Neighborhood'].notna()]
+
+
+def call_type_matrix(df):
+    """Neighborhood x Initial Call Type count matrix, without all-zero columns."""
+    matrix = pd.crosstab(df['Neighborhood'], df['Initial Call Type'])
+    return matrix.loc[:, (matrix != 0).any(axis=0)]
+
+
+def load_neighborhoods(path=NEIGHBORHOODS_GEOJSON):
+    """Load the SPD dispatch neighborhood polygons in EPSG:4326."""
+    import geopandas as gpd
+
+    gdf = gpd.read_file(path)
+    gdf = gdf.rename(columns={"neighborhood": "Neighborhood"})
+    gdf['Neighborhood'] = gdf['Neighborhood'].str.lower().str.strip()
+    return gdf.to_crs(epsg=4326)
+
+
+def local_meters(lat, lon):
+    """(n, 2) x/y meters from the city center; accurate to well under 1% across Seattle."""
+    return np.column_stack([
+        (np.asarray(lon, dtype=float) - SEATTLE_CENTER[1]) * M_PER_DEG_LON,
+        (np.asarray(lat, dtype=float) - SEATTLE_CENTER[0]) * M_PER_DEG_LAT,
+    ])
+
+
+def priority_weights(priority):
+    """Vectorized heatmap weight: priority 1 -> 4 ... priority 4+ -> 1, unparseable -> 1."""
+    val = np.trunc(pd.to_numeric(priority, errors='coerce'))
+    return (5 - val).clip(lower=1).fillna(1).astype(int)
+
+
+def data_hash(path):
+    """SHA-256 of a data file (or of every file under a directory), read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    paths = [path]
+    if os.path.isdir(path):
+        paths = sorted(os.path.join(root, f) for root, _, files in os.walk(path) for f in files)
+    for p in paths:
+        with open(p, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
@@ -0,0 +1,223 @@
+
+"""Hourly weather for every dispatch neighborhood, interpolated from all nearby stations.
+
+    python scripts/station_weather.py fetch     # cache station list + hourly data (Meteostat)
+    python scripts/station_weather.py build     # weight matrix + (hour, neighborhood, variable) cube
+    python scripts/station_weather.py info
+
+The interpolation is a fixed (n_neighborhoods, n_stations) inverse-distance weight
+matrix over each centroid's nearest stations (KD-tree), so the whole cube is one
+matrix product per variable. The merge then attaches weather with an array lookup.
+"""
+
+import argparse
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+import spd_data
+import vocabulary
+
+# === CONFIG ===
+START_DATE = datetime(2023, 4, 1)
+END_DATE = datetime(2025, 4, 1)
+SEARCH_RADIUS_M = 60_000        # stations within this distance of the city center are cached
+STATIONS_PATH = "data/raw/weather_stations.csv"
+HOURLY_DIR = "data/raw/weather_hourly"
+WEIGHTS_PATH = "data/processed/station_weights.npz"
+CUBE_PATH = "data/processed/neighborhood_hourly_weather.npz"
+TIMEZONE = "America/Los_Angeles"   # call timestamps are local; Meteostat hours are UTC
+# Wind direction is left out: a circular quantity cannot be averaged linearly
+VARIABLES = ["temp", "dwpt", "rhum", "prcp", "wspd", "pres"]
+NEAREST_K = 4
+IDW_POWER = 2
+MIN_DISTANCE_M = 100            # floor so a station sitting on a centroid doesn't get infinite weight
+LOCAL_SUFFIX = "_local"
+
+
+# === FETCH ===
+def fetch_stations(radius=SEARCH_RADIUS_M, start=START_DATE, end=END_DATE):
+    """Stations around the city with hourly data in the period, cached to STATIONS_PATH."""
+    from meteostat import Stations
+
+    stations = Stations().nearby(*spd_data.SEATTLE_CENTER, radius).inventory("hourly", (start, end)).fetch()
+    stations = stations.reset_index()[["id", "name", "latitude", "longitude", "elevation"]]
+    os.makedirs(os.path.dirname(STATIONS_PATH), exist_ok=True)
+    stations.to_csv(STATIONS_PATH, index=False)
+    return stations
+
+
+def fetch_hourly(station_ids, start=START_DATE, end=END_DATE, refresh=False):
+    """Cache each station's hourly series as one Parquet file; existing files are kept unless `refresh`."""
+    from meteostat import Hourly
+
+    os.makedirs(HOURLY_DIR, exist_ok=True)
+    fetched = 0
+    for station_id in station_ids:
+        path = os.path.join(HOURLY_DIR, f"{station_id}.parquet")
+        if os.path.exists(path) and not refresh:
+            continue
+        hourly = Hourly(station_id, start, end).fetch()
+        hourly.reindex(columns=VARIABLES).rename_axis("time").reset_index().to_parquet(path, index=False)
+        fetched += 1
+    return fetched
+
+
+def load_stations():
+    """Cached stations that also have a cached hourly file."""
+    stations = pd.read_csv(STATIONS_PATH, dtype={"id": str})
+    has_data = [os.path.exists(os.path.join(HOURLY_DIR, f"{sid}.parquet")) for sid in stations["id"]]
+    return stations[has_data].reset_index(drop=True)
+
+
+def station_cube(station_ids, hours):
+    """(n_hours, n_stations, n_variables) float array on the `hours` grid; gaps are NaN."""
+    cube = np.full((len(hours), len(station_ids), len(VARIABLES)), np.nan)
+    for s, station_id in enumerate(station_ids):
+        hourly = pd.read_parquet(os.path.join(HOURLY_DIR, f"{station_id}.parquet"))
+        index = hours.get_indexer(pd.to_datetime(hourly["time"]).dt.floor("h"))
+        keep = index >= 0
+        values = hourly.reindex(columns=VARIABLES).to_numpy(dtype=float)
+        cube[index[keep], s] = values[keep]
+    return cube
+
+
+# === INTERPOLATION ===
+def neighborhood_centroids(path=spd_data.NEIGHBORHOODS_GEOJSON):
+    """Neighborhood names and (lat, lon) centroids, computed in an equal-area projection."""
+    gdf = spd_data.load_neighborhoods(path)
+    centroids = gdf.geometry.to_crs(epsg=5070).centroid.to_crs(epsg=4326)
+    return gdf["Neighborhood"].to_numpy(dtype=object), centroids.y.to_numpy(), centroids.x.to_numpy()
+
+
+def idw_weights(target_xy, source_xy, k=NEAREST_K, power=IDW_POWER):
+    """(n_target, n_source) row-normalized inverse-distance weights over each target's k nearest sources."""
+    k = min(k, len(source_xy))
+    distance, index = cKDTree(source_xy).query(target_xy, k=k)
+    distance, index = distance.reshape(len(target_xy), k), index.reshape(len(target_xy), k)
+    weight = 1.0 / np.maximum(distance, MIN_DISTANCE_M) ** power
+    W = np.zeros((len(target_xy), len(source_xy)))
+    np.put_along_axis(W, index, weight, axis=1)
+    return W / W.sum(axis=1, keepdims=True)
+
+
+def interpolate(W, cube):
+    """(n_hours, n_targets, n_variables) weighted means that skip missing station readings.
+
+    Dividing by W applied to the availability mask renormalizes each target's weights
+    over the stations that reported that hour; a target is NaN only when all of its
+    stations are missing.
+    """
+    available = ~np.isnan(cube)
+    values = np.where(available, cube, 0.0)
+    result = np.empty((cube.shape[0], W.shape[0], cube.shape[2]), dtype=np.float32)
+    for v in range(cube.shape[2]):
+        numerator = values[:, :, v] @ W.T
+        denominator = available[:, :, v] @ W.T
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result[:, :, v] = np.where(denominator > 0, numerator / denominator, np.nan)
+    return result
+
+
+def build(neighborhoods_path=spd_data.NEIGHBORHOODS_GEOJSON, start=START_DATE, end=END_DATE,
+          k=NEAREST_K, power=IDW_POWER):
+    """Compute the weight matrix and the neighborhood cube from the cached station data."""
+    stations = load_stations()
+    if stations.empty:
+        raise FileNotFoundError(f"No cached station data in {HOURLY_DIR}; run `station_weather.py fetch` first")
+    names, lat, lon = neighborhood_centroids(neighborhoods_path)
+    W = idw_weights(spd_data.local_meters(lat, lon),
+                    spd_data.local_meters(stations["latitude"], stations["longitude"]), k, power)
+
+    hours = pd.date_range(start, end, freq="h", inclusive="left")
+    cube = interpolate(W, station_cube(stations["id"], hours))
+
+    os.makedirs(os.path.dirname(CUBE_PATH), exist_ok=True)
+    np.savez_compressed(WEIGHTS_PATH, weights=W, neighborhoods=names.astype(str),
+                        stations=stations["id"].to_numpy(dtype=str))
+    np.savez_compressed(CUBE_PATH, cube=cube, start=np.datetime64(hours[0], "h"),
+                        neighborhoods=names.astype(str), variables=np.array(VARIABLES))
+    return W, cube, stations, names
+
+
+# === LOOKUP ===
+def load_cube(path=CUBE_PATH):
+    with np.load(path) as data:
+        cube = {key: data[key] for key in ("cube", "neighborhoods", "variables")}
+        cube["start"] = pd.Timestamp(data["start"][()])
+    return cube
+
+
+def hour_index(timestamps, start):
+    """Row index into the cube's UTC hour axis for local call timestamps (-1 when unparseable)."""
+    ts = pd.to_datetime(timestamps, errors="coerce", format="mixed")
+    # The fall-back hour (01:00-01:59 twice) cannot be told apart in local time, and "infer"
+    # needs sorted timestamps; every call in it is read as the first (daylight-time) pass
+    first_pass = np.ones(len(ts), dtype=bool)
+    utc = ts.dt.tz_localize(TIMEZONE, ambiguous=first_pass, nonexistent="shift_forward").dt.tz_convert(None)
+    hours = (utc.dt.floor("h") - start) // pd.Timedelta(hours=1)
+    return hours.fillna(-1).to_numpy(dtype=np.int64)
+
+
+def attach_neighborhood_weather(df, timestamp_col=spd_data.TIMESTAMP_COL,
+                                neighborhood_col="Dispatch Neighborhood", cube=None):
+    """Add `<variable>_local` columns: the call's neighborhood weather for the hour it was queued.
+
+    One fancy-indexing read of the cube replaces a per-row join; calls with no
+    neighborhood match or outside the cube's period get NaN.
+    """
+    cube = cube or load_cube()
+    values = cube["cube"]
+    hour = hour_index(df[timestamp_col], cube["start"])
+    names = vocabulary.normalize_distinct(df[neighborhood_col])
+    place = pd.Index(cube["neighborhoods"]).get_indexer(names)
+    valid = (hour >= 0) & (hour < values.shape[0]) & (place >= 0)
+
+    local = np.full((len(df), values.shape[2]), np.nan, dtype=np.float32)
+    local[valid] = values[hour[valid], place[valid]]
+    for v, variable in enumerate(cube["variables"]):
+        df[f"{variable}{LOCAL_SUFFIX}"] = local[:, v]
+    return df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-neighborhood hourly weather interpolated from nearby stations.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    fetch = sub.add_parser("fetch", help="cache the station list and hourly data from Meteostat")
+    fetch.add_argument("--radius", type=float, default=SEARCH_RADIUS_M, help="meters from the city center")
+    fetch.add_argument("--refresh", action="store_true", help="re-download stations that are already cached")
+    build_parser = sub.add_parser("build", help="compute the weight matrix and the neighborhood cube")
+    build_parser.add_argument("--k", type=int, default=NEAREST_K, help="nearest stations per neighborhood")
+    build_parser.add_argument("--power", type=float, default=IDW_POWER)
+    sub.add_parser("info", help="show which stations feed each neighborhood")
+    args = parser.parse_args(argv)
+
+    if args.command == "fetch":
+        start = time.perf_counter()
+        stations = fetch_stations(args.radius)
+        fetched = fetch_hourly(stations["id"], refresh=args.refresh)
+        print(f"✅ {len(stations)} stations within {args.radius / 1000:.0f} km; {fetched} downloaded, "
+              f"{len(stations) - fetched} already cached in {HOURLY_DIR} ({time.perf_counter() - start:.1f}s)")
+    elif args.command == "build":
+        start = time.perf_counter()
+        W, cube, stations, names = build(k=args.k, power=args.power)
+        coverage = 1 - np.isnan(cube).mean(axis=(0, 1))
+        print(f"✅ {cube.shape[0]:,} hours x {len(names)} neighborhoods x {len(VARIABLES)} variables "
+              f"from {len(stations)} stations in {time.perf_counter() - start:.1f}s; saved to {CUBE_PATH}")
+        print("📊 Coverage: " + ", ".join(f"{v} {c:.1%}" for v, c in zip(VARIABLES, coverage)))
+    else:
+        with np.load(WEIGHTS_PATH) as data:
+            W, names, station_ids = data["weights"], data["neighborhoods"], data["stations"]
+        top = np.argsort(-W, axis=1)[:, :NEAREST_K]
+        rows = [{"neighborhood": name,
+                 "stations": ", ".join(f"{station_ids[s]} ({W[i, s]:.2f})" for s in top[i] if W[i, s] > 0)}
+                for i, name in enumerate(names)]
+        print(pd.DataFrame(rows).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+
+import argparse
+import os
+import time
+from functools import partial
+
+import pandas as pd
+
+import sketches
+import spd_data
+import vocabulary
+from sketches import TopKSketch
+
+# === CONFIG ===
+SKETCH_PATH = "models/top_call_type_sketch.pkl"
+OUTPUT_PREFIX = "output/top_call_types"
+TOP_K = 3
+USECOLS = ["Dispatch Neighborhood", "Initial Call Type"]
+
+# Cluster label files produced by the clustering scripts: name -> (csv, label column)
+CLUSTER_SOURCES = {
+    "calltype": ("output/neighborhood_calltype_clusters.csv", "call_type_cluster"),
+    "gmm": ("output/neighborhood_gmm_clusters.csv", "gmm_cluster"),
+    "gmm_bic": ("output/neighborhood_gmm_bic_clusters.csv", "gmm_cluster"),
+    "hdbscan": ("output/neighborhood_hdbscan_clusters.csv", "hdbscan_cluster"),
+    "pca": ("output/neighborhood_pca_clusters.csv", "pca_cluster"),
+}
+
+
+def neighborhood_sketch(df, capacity=sketches.DEFAULT_CAPACITY):
+    """Heavy-hitter sketch of `Initial Call Type` per valid neighborhood for a frame of calls."""
+    return TopKSketch(["Neighborhood"], capacity).update(spd_data.valid_calls(df), "Initial Call Type")
+
+
+def sketch_chunk(chunk, capacity=sketches.DEFAULT_CAPACITY):
+    chunk["Initial Call Type"] = vocabulary.decode_column(chunk, "Initial Call Type")
+    return neighborhood_sketch(chunk, capacity)
+
+
+def cluster_sketch(sketch, clusters, label_col):
+    """Merge neighborhood sketches into per-cluster sketches using a cluster label table."""
+    labels = clusters.assign(Neighborhood=clusters["Neighborhood"].str.lower().str.strip())
+    return sketch.regroup(dict(zip(labels["Neighborhood"], labels[label_col])), label_col)
+
+
+def neighborhood_top_strings(df, k=TOP_K):
+    """Exact top call types per valid neighborhood for a frame already in memory (map tooltips).
+
+    The sketch is only needed when the calls arrive in chunks; in memory an exact
+    count is as fast and never reports a wrong call type. Ties are broken by name.
+    """
+    counts = spd_data.valid_calls(df).groupby(["Neighborhood", "Initial Call Type"], observed=True).size()
+    counts = counts.rename("count").reset_index()
+    counts = counts.sort_values(["Neighborhood", "count", "Initial Call Type"], ascending=[True, False, True])
+    return counts.groupby("Neighborhood").head(k).groupby("Neighborhood")["Initial Call Type"].agg(", ".join)
+
+
+def build(path, workers=1, chunk_rows=spd_data.CHUNK_ROWS, capacity=sketches.DEFAULT_CAPACITY):
+    chunks = spd_data.read_chunks(path, USECOLS, chunk_rows)
+    return sketches.map_merge(chunks, partial(sketch_chunk, capacity=capacity), TopKSketch.merge, workers)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Streaming top call types per neighborhood and cluster.")
+    parser.add_argument("--input", default=spd_data.MERGED_DATA_PATH)
+    parser.add_argument("--append", action="store_true", help="merge into the saved sketch instead of replacing it")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--chunk-rows", type=int, default=spd_data.CHUNK_ROWS)
+    parser.add_argument("--capacity", type=int, default=sketches.DEFAULT_CAPACITY,
+                        help="Space-Saving counters per neighborhood")
+    parser.add_argument("--top", type=int, default=TOP_K)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    sketch = build(args.input, args.workers, args.chunk_rows, args.capacity)
+    if args.append and os.path.exists(SKETCH_PATH):
+        sketch = sketches.load(SKETCH_PATH).merge(sketch)
+    sketches.save(sketch, SKETCH_PATH)
+    print(f"✅ Sketched {int(sketch.totals.sum()):,} calls over {len(sketch.keys)} neighborhoods "
+          f"in {time.perf_counter() - start:.1f}s; saved to {SKETCH_PATH}")
+
+    os.makedirs(os.path.dirname(OUTPUT_PREFIX), exist_ok=True)
+    outputs = {"neighborhood": sketch}
+    for name, (path, label_col) in CLUSTER_SOURCES.items():
+        if os.path.exists(path):
+            outputs[name] = cluster_sketch(sketch, pd.read_csv(path), label_col)
+
+    for name, result in outputs.items():
+        out_path = f"{OUTPUT_PREFIX}_by_{name}.csv"
+        result.top(args.top).sort_values(result.key_names + ["rank"]).to_csv(out_path, index=False)
+        print(f"📊 Top {args.top} call types by {name} saved to {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+
+import argparse
+import json
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import HalvingRandomSearchCV, PredefinedSplit
+
+import spd_data
+import vocabulary
+
+# === CONFIG ===
+CACHE_DIR = "data/processed/classifier_cache"
+MODEL_PATH = "models/call_type_classifier.joblib"
+TRACE_CSV = "output/call_type_classifier_search.csv"
+CANDIDATES_CSV = "output/call_type_classifier_candidates.csv"
+TARGET_COL = "Final Call Type"
+FEATURE_COLUMNS = [
+    'call_type_code', 'Dispatch Precinct', 'Dispatch Sector',
+    'neighborhood_code', 'tavg', 'tmin', 'tmax', 'prcp',
+    'wdir', 'wspd', 'pres',
+]
+CATEGORICAL_COLUMNS = ['Dispatch Precinct', 'Dispatch Sector']
+TEST_SIZE = 0.2
+N_FOLDS = 3
+N_CANDIDATES = 48
+HALVING_FACTOR = 3
+RANDOM_STATE = 42
+
+PARAM_DISTRIBUTIONS = {
+    "n_estimators": [25, 50, 100, 200],
+    "max_depth": [8, 12, 15, 20, 30, None],
+    "min_samples_leaf": [1, 2, 5, 10, 25],
+    "max_features": ["sqrt", "log2", 0.5],
+    "class_weight": ["balanced", "balanced_subsample", None],
+}
+
+
+# === FEATURE CACHE ===
+def build_cache(path=spd_data.MERGED_DATA_PATH, cache_dir=CACHE_DIR, n_folds=N_FOLDS):
+    """Encode the features once and save X, y and CV folds as .npy files for memory-mapping.
+
+    Rows are stored shuffled with the training rows first, so the training set is
+    a contiguous slice of the memory-mapped arrays (no copy when searching).
+    """
+    df = pd.read_csv(path, usecols=FEATURE_COLUMNS + [TARGET_COL], dtype=vocabulary.CODE_DTYPES,
+                     low_memory=False).dropna()
+    categories = {}
+    for col in CATEGORICAL_COLUMNS:
+        codes, uniques = pd.factorize(df[col].astype(str), sort=True)
+        df[col] = codes
+        categories[col] = list(uniques)
+    y, classes = pd.factorize(df[TARGET_COL].astype(str), sort=True)
+    X = df[FEATURE_COLUMNS].to_numpy(dtype=np.float32)
+
+    rng = np.random.default_rng(RANDOM_STATE)
+    order = rng.permutation(len(df))
+    n_train = len(df) - int(round(TEST_SIZE * len(df)))
+    folds = rng.integers(0, n_folds, n_train).astype(np.int8)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    np.save(os.path.join(cache_dir, "X.npy"), X[order])
+    np.save(os.path.join(cache_dir, "y.npy"), y[order].astype(np.int32))
+    np.save(os.path.join(cache_dir, "folds.npy"), folds)
+    meta = {
+        "data_hash": spd_data.data_hash(path),
+        "n_train": n_train,
+        "n_folds": n_folds,
+        "feature_names": FEATURE_COLUMNS,
+        "categories": categories,
+        "classes": list(classes),
+    }
+    with open(os.path.join(cache_dir, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def load_cache(cache_dir=CACHE_DIR):
+    """Memory-mapped X, y, folds and the cache metadata."""
+    with open(os.path.join(cache_dir, "meta.json")) as f:
+        meta = json.load(f)
+    arrays = {name: np.load(os.path.join(cache_dir, f"{name}.npy"), mmap_mode="r") for name in ("X", "y", "folds")}
+    return arrays["X"], arrays["y"], arrays["folds"], meta
+
+
+def cache_is_current(path, cache_dir=CACHE_DIR, n_folds=N_FOLDS):
+    meta_path = os.path.join(cache_dir, "meta.json")
+    if not os.path.exists(meta_path):
+        return False
+    with open(meta_path) as f:
+        meta = json.load(f)
+    return meta["n_folds"] == n_folds and meta["data_hash"] == spd_data.data_hash(path)
+
+
+# === SEARCH ===
+def search(X, y, folds, n_candidates=N_CANDIDATES, factor=HALVING_FACTOR, workers=-1, scoring="f1_macro"):
+    """Successive halving over random RandomForest configurations, growing n_samples each round.
+
+    Candidate fits run in a joblib process pool; the memory-mapped inputs are
+    shared with the workers by file reference instead of being copied.
+    """
+    searcher = HalvingRandomSearchCV(
+        RandomForestClassifier(random_state=RANDOM_STATE, n_jobs=1),
+        PARAM_DISTRIBUTIONS,
+        n_candidates=n_candidates,
+        factor=factor,
+        resource="n_samples",
+        min_resources="exhaust",  # size the first round so the last one uses every training row
+        cv=PredefinedSplit(folds),
+        scoring=scoring,
+        refit=True,
+        n_jobs=workers,
+        random_state=RANDOM_STATE,
+        verbose=1,
+    )
+    return searcher.fit(X, y)
+
+
+def search_trace(searcher, n_folds):
+    """One row per (round, candidate) with its resources, score and CPU time spent."""
+    results = pd.DataFrame(searcher.cv_results_)
+    trace = pd.DataFrame({
+        "round": results["iter"],
+        "n_samples": results["n_resources"],
+        "params": results["params"].map(lambda p: json.dumps(p, sort_keys=True)),
+        "mean_test_score": results["mean_test_score"].round(5),
+        "std_test_score": results["std_test_score"].round(5),
+        "mean_fit_time_s": results["mean_fit_time"].round(3),
+        "seconds_spent": ((results["mean_fit_time"] + results["mean_score_time"]) * n_folds).round(3),
+    })
+    candidates = (trace.groupby("params")
+                  .agg(rounds=("round", "count"), max_samples=("n_samples", "max"),
+                       final_score=("mean_test_score", "last"), seconds_spent=("seconds_spent", "sum"))
+                  .reset_index()
+                  .round({"seconds_spent": 3})
+                  .sort_values(["rounds", "final_score"], ascending=False))
+    return trace, candidates
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Successive-halving search for the Final Call Type RandomForest.")
+    parser.add_argument("--input", default=spd_data.MERGED_DATA_PATH)
+    parser.add_argument("--rebuild-cache", action="store_true", help="re-encode features even if the cache is current")
+    parser.add_argument("--candidates", type=int, default=N_CANDIDATES, help="configurations in the first round")
+    parser.add_argument("--factor", type=int, default=HALVING_FACTOR, help="keep 1/factor of candidates per round")
+    parser.add_argument("--workers", type=int, default=-1, help="parallel candidate fits (-1 = all cores)")
+    parser.add_argument("--scoring", default="f1_macro")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.rebuild_cache or not cache_is_current(args.input):
+        build_cache(args.input)
+        print(f"✅ Feature cache written to {CACHE_DIR} in {time.perf_counter() - start:.1f}s")
+    X, y, folds, meta = load_cache()
+    n_train = meta["n_train"]
+    X_train, y_train = X[:n_train], y[:n_train]
+    print(f"📊 {n_train:,} training rows, {len(y) - n_train:,} held out, {len(meta['classes'])} classes")
+
+    start = time.perf_counter()
+    searcher = search(X_train, y_train, folds, args.candidates, args.factor, args.workers, args.scoring)
+    search_time = time.perf_counter() - start
+
+    trace, candidates = search_trace(searcher, meta["n_folds"])
+    os.makedirs(os.path.dirname(TRACE_CSV), exist_ok=True)
+    trace.to_csv(TRACE_CSV, index=False)
+    candidates.to_csv(CANDIDATES_CSV, index=False)
+
+    y_pred = searcher.best_estimator_.predict(X[n_train:])
+    holdout = {
+        "accuracy": round(float(accuracy_score(y[n_train:], y_pred)), 4),
+        "f1_macro": round(float(f1_score(y[n_train:], y_pred, average="macro")), 4),
+    }
+    os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
+    joblib.dump({
+        "model": searcher.best_estimator_,
+        "best_params": searcher.best_params_,
+        "feature_names": meta["feature_names"],
+        "categories": meta["categories"],
+        "classes": meta["classes"],
+        "data_hash": meta["data_hash"],
+        "holdout": holdout,
+    }, MODEL_PATH)
+
+    print(f"✅ Searched {len(candidates)} configurations over {searcher.n_iterations_} rounds in {search_time:.1f}s")
+    print(f"📊 Best {args.scoring} (CV) {searcher.best_score_:.4f} with {searcher.best_params_}")
+    print(f"📊 Held-out accuracy {holdout['accuracy']}, macro F1 {holdout['f1_macro']}")
+    print(f"✅ Model saved to {MODEL_PATH}; search trace saved to {TRACE_CSV} and {CANDIDATES_CSV}")
+
+
+if __name__ == "__main__":
+    main()
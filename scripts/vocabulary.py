@@ -0,0 +1,94 @@
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# === CONFIG ===
+VOCABULARY_PATH = "data/processed/vocabulary.json"
+
+# Source column -> integer code column written to the processed data
+CODE_COLUMNS = {
+    "Dispatch Neighborhood": "neighborhood_code",
+    "Initial Call Type": "call_type_code",
+}
+CODE_DTYPE = np.int16
+CODE_DTYPES = {code_col: CODE_DTYPE for code_col in CODE_COLUMNS.values()}
+
+
+def normalize_distinct(series):
+    """Return `series.astype(str).str.lower().str.strip()`, doing the string work once per distinct value."""
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    normalized = pd.Index(uniques).astype(str).str.lower().str.strip()
+    return pd.Series(np.asarray(normalized, dtype=object)[codes], index=series.index, name=series.name)
+
+
+class Vocabulary:
+    """Append-only mapping from normalized names to stable int16 codes.
+
+    Codes are assigned in first-seen order and never reused or reordered, so a
+    code written by one run means the same neighborhood or call type in every
+    later run, clustering output and model.
+    """
+
+    def __init__(self, terms=None):
+        self.terms = {column: list((terms or {}).get(column, [])) for column in CODE_COLUMNS}
+        self.index = {column: {name: code for code, name in enumerate(names)}
+                      for column, names in self.terms.items()}
+
+    @classmethod
+    def load(cls, path=VOCABULARY_PATH):
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def save(self, path=VOCABULARY_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.terms, f, indent=1)
+
+    def encode(self, column, series, grow=True):
+        """Map raw values to int16 codes, normalizing each distinct value once.
+
+        Unseen names are appended when `grow` is true; otherwise they encode as -1.
+        """
+        codes, uniques = pd.factorize(series, use_na_sentinel=False)
+        normalized = pd.Index(uniques).astype(str).str.lower().str.strip()
+
+        index = self.index[column]
+        lookup = np.empty(len(normalized), dtype=CODE_DTYPE)
+        for i, name in enumerate(normalized):
+            if name not in index:
+                if not grow:
+                    lookup[i] = -1
+                    continue
+                if len(self.terms[column]) > np.iinfo(CODE_DTYPE).max:
+                    raise ValueError(f"Vocabulary for {column!r} exceeds the int16 code range")
+                index[name] = len(self.terms[column])
+                self.terms[column].append(name)
+            lookup[i] = index[name]
+        return lookup[codes]
+
+    def decode(self, column, codes):
+        """Map codes back to normalized names (an array take, no string operations)."""
+        names = np.asarray(self.terms[column] + [np.nan], dtype=object)
+        codes = np.asarray(codes)
+        return names[np.where(codes < 0, len(names) - 1, codes)]
+
+    def add_codes(self, df):
+        """Add the int16 code column for every vocabulary column present in `df`."""
+        for column, code_col in CODE_COLUMNS.items():
+            if column in df.columns:
+                df[code_col] = self.encode(column, df[column])
+        return df
+
+
+def decode_column(df, column, vocab=None):
+    """Normalized names for `column`, read from its code column when the data has one."""
+    code_col = CODE_COLUMNS.get(column)
+    if code_col in df.columns and (vocab is not None or os.path.exists(VOCABULARY_PATH)):
+        vocab = vocab or Vocabulary.load()
+        return pd.Series(vocab.decode(column, df[code_col].to_numpy()), index=df.index, name=column)
+    return normalize_distinct(df[column])
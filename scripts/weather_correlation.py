@@ -0,0 +1,216 @@
+
+import argparse
+import os
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+import spd_data
+import station_weather
+import vocabulary
+
+# === CONFIG ===
+WEATHER_DATA_PATH = "data/raw/seattle_weather_apr2023_apr2025.csv"
+COUNTS_PATH = "data/processed/daily_call_counts.npz"
+OUTPUT_CSV = "output/weather_call_correlations.csv"
+HOURLY_COUNTS_PATH = "data/processed/hourly_call_counts.npz"
+HOURLY_OUTPUT_CSV = "output/weather_call_correlations_hourly.csv"
+WEATHER_VARS = ["tavg", "tmin", "tmax", "prcp", "wspd", "pres"]
+LAGS = [0, 1, 2, 3, 7]      # weather N days before the calls
+ROLLING_WINDOWS = [3, 7]    # trailing means ending on the call day
+HOURLY_LAGS = [0, 1, 2, 3, 6, 12, 24]   # weather N hours before the calls
+HOURLY_ROLLING_WINDOWS = [3, 24]
+MIN_CALLS = 100             # skip call types / neighborhoods with fewer calls in total
+DIMENSIONS = {"call_type": "Initial Call Type", "neighborhood": "Dispatch Neighborhood"}
+
+
+# === COUNT MATRICES ===
+def daily_counts(df, days):
+    """(n_days, n_labels) call counts per dimension, each built with a single bincount."""
+    day_index = pd.to_datetime(df[spd_data.TIMESTAMP_COL], errors="coerce").dt.normalize()
+    return period_counts(df, days.get_indexer(day_index), len(days))
+
+
+def hourly_counts(df, hours):
+    """(n_hours, n_labels) call counts per dimension on the weather cube's UTC hour axis."""
+    hour = station_weather.hour_index(df[spd_data.TIMESTAMP_COL], hours[0])
+    return period_counts(df, np.where(hour < len(hours), hour, -1), len(hours))
+
+
+def period_counts(df, period, n_periods):
+    """Count matrices from each call's period row (-1 for calls outside the periods)."""
+    matrices = {}
+    for name, column in DIMENSIONS.items():
+        names = vocabulary.decode_column(df, column)
+        if name == "neighborhood":
+            names = names.where(~names.isin(spd_data.INVALID_NEIGHBORHOODS))
+        codes, labels = pd.factorize(names)
+        keep = (period >= 0) & (codes >= 0)
+        counts = np.bincount(period[keep] * len(labels) + codes[keep], minlength=n_periods * len(labels))
+        matrices[name] = (counts.reshape(n_periods, len(labels)).astype(np.float64), np.asarray(labels, dtype=object))
+    return matrices
+
+
+# === WEATHER FEATURES ===
+def weather_features(weather, days, variables=WEATHER_VARS, lags=LAGS, windows=ROLLING_WINDOWS):
+    """(n_days, n_features) lagged and trailing-mean weather, plus (variable, kind, lag) per feature."""
+    return lagged_features(weather.set_index("date")[variables].reindex(days), lags, windows, "d")
+
+
+def hourly_weather(cube):
+    """City-wide hourly weather: the mean over neighborhoods of the station-interpolated cube."""
+    hours = pd.date_range(cube["start"], periods=cube["cube"].shape[0], freq="h")
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # hours with no station data stay NaN
+        values = np.nanmean(cube["cube"], axis=1)
+    return pd.DataFrame(values, index=hours, columns=cube["variables"].astype(str))
+
+
+def lagged_features(aligned, lags, windows, unit):
+    """Lagged and trailing-mean features of weather already aligned to the count periods.
+
+    Lags and windows are counted in periods (days or hours); `unit` names the window.
+    """
+    blocks, meta = [], []
+    for lag in lags:
+        blocks.append(aligned.shift(lag).to_numpy())
+        meta += [(v, "lag", lag) for v in aligned.columns]
+    for window in windows:
+        blocks.append(aligned.rolling(window, min_periods=window).mean().to_numpy())
+        meta += [(v, f"rolling_mean_{window}{unit}", 0) for v in aligned.columns]
+    features = np.hstack(blocks)
+    return features, pd.DataFrame(meta, columns=["variable", "feature", "lag"])
+
+
+# === BATCHED STATISTICS ===
+def pairwise_corr(counts, features):
+    """Pearson r for every (count column, feature) pair using each feature's non-missing days.
+
+    Missing weather is handled with a mask matrix, so the whole (K, P) grid is a
+    handful of matrix products instead of K * P separate correlations.
+    """
+    mask = ~np.isnan(features)
+    f = np.where(mask, features, 0.0)
+    m = mask.astype(np.float64)
+    n = m.sum(axis=0)
+    sx, sxx = counts.T @ m, (counts ** 2).T @ m
+    sy, syy = f.sum(axis=0), (f ** 2).sum(axis=0)
+    sxy = counts.T @ f
+    cov = n * sxy - sx * sy
+    var_x, var_y = n * sxx - sx ** 2, n * syy - sy ** 2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return cov / np.sqrt(var_x * var_y), n
+
+
+def controls(days):
+    """Day-of-week dummies plus a linear trend (with intercept)."""
+    dow = np.eye(7)[days.dayofweek]
+    trend = np.linspace(-1, 1, len(days))[:, None]
+    return np.hstack([dow, trend])
+
+
+def hourly_controls(hours):
+    """Local hour-of-week dummies plus a linear trend, for UTC hours."""
+    local = hours.tz_localize("UTC").tz_convert(station_weather.TIMEZONE)
+    how = np.eye(7 * 24)[local.dayofweek * 24 + local.hour]
+    trend = np.linspace(-1, 1, len(hours))[:, None]
+    return np.hstack([how, trend])
+
+
+def residualize(Y, Z):
+    """Residuals of every column of Y after least squares on Z (one lstsq for all columns)."""
+    coef, *_ = np.linalg.lstsq(Z, Y, rcond=None)
+    return Y - Z @ coef
+
+
+def partial_effects(counts, features, Z):
+    """Partial correlation and slope (calls per unit of weather) controlling for Z, on complete days."""
+    complete = ~np.isnan(features).any(axis=1)
+    rc = residualize(counts[complete], Z[complete])
+    rf = residualize(features[complete], Z[complete])
+    cross = rc.T @ rf
+    ss_c, ss_f = (rc ** 2).sum(axis=0), (rf ** 2).sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r = cross / np.sqrt(np.outer(ss_c, ss_f))
+        slope = cross / ss_f
+    dof = complete.sum() - Z.shape[1] - 1
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = r * np.sqrt(dof / (1 - r ** 2))
+    p = 2 * stats.t.sf(np.abs(t), dof)
+    return r, slope, p, int(complete.sum())
+
+
+def correlation_table(name, counts, labels, features, feature_meta, Z, min_calls=MIN_CALLS, unit="days"):
+    keep = counts.sum(axis=0) >= min_calls
+    counts, labels = counts[:, keep], labels[keep]
+    r, n = pairwise_corr(counts, features)
+    pr, slope, p, n_complete = partial_effects(counts, features, Z)
+
+    k, f = r.shape
+    table = pd.concat([feature_meta] * k, ignore_index=True)
+    table.insert(0, "target", np.repeat(labels, f))
+    table.insert(0, "dimension", name)
+    table["corr"] = r.ravel().round(4)
+    table[f"n_{unit}"] = np.tile(n, k).astype(int)
+    table["partial_corr"] = pr.ravel().round(4)
+    table["partial_slope"] = slope.ravel().round(4)
+    table["p_value"] = p.ravel()
+    table[f"n_{unit}_complete"] = n_complete
+    return table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="All call-type/neighborhood x weather x lag correlations.")
+    parser.add_argument("--freq", choices=["daily", "hourly"], default="daily",
+                        help="hourly uses the station-interpolated weather cube (station_weather.py build)")
+    parser.add_argument("--weather", default=WEATHER_DATA_PATH, help="daily weather CSV")
+    parser.add_argument("--cube", default=station_weather.CUBE_PATH, help="hourly weather cube")
+    parser.add_argument("--min-calls", type=int, default=MIN_CALLS)
+    parser.add_argument("--top", type=int, default=15, help="strongest partial correlations to print")
+    args = parser.parse_args(argv)
+
+    df = spd_data.load_calls(usecols=[spd_data.TIMESTAMP_COL, "Dispatch Neighborhood", "Initial Call Type"])
+    if args.freq == "daily":
+        weather = pd.read_csv(args.weather, parse_dates=["date"])
+        periods = pd.date_range(weather["date"].min(), weather["date"].max(), freq="D")
+        counts_path, output_csv, unit = COUNTS_PATH, OUTPUT_CSV, "days"
+    else:
+        weather = hourly_weather(station_weather.load_cube(args.cube))
+        periods = weather.index
+        counts_path, output_csv, unit = HOURLY_COUNTS_PATH, HOURLY_OUTPUT_CSV, "hours"
+
+    start = time.perf_counter()
+    if args.freq == "daily":
+        matrices = daily_counts(df, periods)
+        features, feature_meta = weather_features(weather, periods)
+        Z = controls(periods)
+    else:
+        matrices = hourly_counts(df, periods)
+        features, feature_meta = lagged_features(weather, HOURLY_LAGS, HOURLY_ROLLING_WINDOWS, "h")
+        Z = hourly_controls(periods)
+    tables = [correlation_table(name, counts, labels, features, feature_meta, Z, args.min_calls, unit)
+              for name, (counts, labels) in matrices.items()]
+    result = pd.concat(tables, ignore_index=True)
+    elapsed = time.perf_counter() - start
+
+    period_format = "%Y-%m-%d" if args.freq == "daily" else "%Y-%m-%dT%H"
+    os.makedirs(os.path.dirname(counts_path), exist_ok=True)
+    np.savez_compressed(counts_path, **{unit: periods.strftime(period_format).to_numpy()},
+                        **{f"{name}_counts": counts for name, (counts, _) in matrices.items()},
+                        **{f"{name}_labels": labels.astype(str) for name, (_, labels) in matrices.items()})
+    os.makedirs(os.path.dirname(output_csv), exist_ok=True)
+    result.sort_values("p_value").to_csv(output_csv, index=False)
+
+    print(f"✅ {len(result):,} correlations ({len(periods):,} {unit} x {features.shape[1]} weather features) "
+          f"computed in {elapsed:.2f}s; saved to {output_csv}")
+    print(f"📊 {args.freq.title()} count matrices saved to {counts_path}")
+    strongest = result.reindex(result["partial_corr"].abs().sort_values(ascending=False).index).head(args.top)
+    print(strongest[["dimension", "target", "variable", "feature", "lag", "corr", "partial_corr", "p_value"]]
+          .to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+# The scripts import each other as top-level modules, as when run from scripts/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+
+@pytest.fixture(autouse=True)
+def in_tmp_dir(tmp_path, monkeypatch):
+    """Run every test from an empty directory so the repo-relative data/ and output/ paths stay untouched."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
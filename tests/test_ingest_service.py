@@ -0,0 +1,36 @@
+import asyncio
+import csv
+import io
+
+import ingest_service
+
+
+async def lines_of(text):
+    for line in io.StringIO(text, newline=""):
+        yield line
+
+
+def collect(text):
+    async def run():
+        return [row async for row in ingest_service.csv_records(lines_of(text))]
+    return asyncio.run(run())
+
+
+def test_csv_records_keeps_newlines_inside_quoted_fields():
+    rows = [["id", "note"], ["1", "first line\nsecond line"], ["2", 'says ""hi""\r\nthen "bye"'], ["3", "plain"]]
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+
+    assert collect(buffer.getvalue()) == rows
+
+
+def test_csv_records_skips_blank_lines():
+    assert collect("a,b\n\n1,2\n") == [["a", "b"], ["1", "2"]]
+
+
+def test_stats_keeps_a_bounded_lag_window():
+    stats = ingest_service.Stats()
+    stats.record([0.0] * (ingest_service.LAG_WINDOW + 10))
+
+    assert stats.events == ingest_service.LAG_WINDOW + 10
+    assert len(stats.lags) == ingest_service.LAG_WINDOW
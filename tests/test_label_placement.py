@@ -0,0 +1,41 @@
+import geopandas as gpd
+import shapely
+
+import label_placement
+
+
+class RecordingAxes:
+    def __init__(self):
+        self.texts = {}
+
+    def plot(self, *args, **kwargs):
+        pass
+
+    def text(self, x, y, label, **kwargs):
+        self.texts[label] = (x, y)
+
+
+def test_labels_that_only_share_an_edge_count_as_overlapping():
+    # Two small areas exactly one label width apart: their first ring offsets (to the east)
+    # give boxes that touch along an edge, which matplotlib's inclusive Bbox.overlaps rejects
+    squares = [shapely.box(x - 10, -10, x + 10, 10) for x in (0, 4000)]
+    gdf = gpd.GeoDataFrame({"Neighborhood": ["west", "east"]}, geometry=squares)
+    ax = RecordingAxes()
+
+    label_placement.place_neighborhood_labels(ax, gdf, label_box_size=(4000, 2000), offset_step=2000)
+
+    (west_x, west_y), (east_x, east_y) = ax.texts["West"], ax.texts["East"]
+    assert (west_x, west_y) == (2000, 0)
+    # Every first-ring spot of the east label touches or overlaps the west box; it moves out a ring
+    assert (east_x, east_y) == (8000, 0)
+
+
+def test_overlapping_labels_move_to_another_offset():
+    squares = [shapely.box(x - 10, -10, x + 10, 10) for x in (0, 3000)]
+    gdf = gpd.GeoDataFrame({"Neighborhood": ["west", "east"]}, geometry=squares)
+    ax = RecordingAxes()
+
+    label_placement.place_neighborhood_labels(ax, gdf, label_box_size=(4000, 2000), offset_step=2000)
+
+    (west_x, west_y), (east_x, east_y) = ax.texts["West"], ax.texts["East"]
+    assert abs(east_x - west_x) >= 4000 or abs(east_y - west_y) >= 2000
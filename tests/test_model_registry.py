@@ -0,0 +1,63 @@
+import os
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+from sklearn.preprocessing import FunctionTransformer, StandardScaler
+
+import model_registry
+from model_registry import ClusterPipeline
+
+
+def make_matrix():
+    return pd.DataFrame({"noise": [5, 0, 3, 1], "theft": [1, 4, 2, 6]},
+                        index=pd.Index(["a", "b", "c", "d"], name="Neighborhood"))
+
+
+def test_matrix_hash_tracks_values_labels_and_columns():
+    matrix = make_matrix()
+    assert model_registry.matrix_hash(matrix) == model_registry.matrix_hash(matrix.copy())
+    assert model_registry.matrix_hash(matrix) != model_registry.matrix_hash(matrix.assign(noise=[5, 0, 3, 2]))
+    assert model_registry.matrix_hash(matrix) != model_registry.matrix_hash(matrix.rename(index={"a": "z"}))
+    assert model_registry.matrix_hash(matrix) != model_registry.matrix_hash(matrix.rename(columns={"noise": "x"}))
+
+
+def fit_kmeans(matrix, n_clusters=2):
+    scaler = StandardScaler().fit(matrix)
+    kmeans = KMeans(n_clusters=n_clusters, n_init=1, random_state=0).fit(scaler.transform(matrix))
+    return ClusterPipeline(scaler, None, kmeans, matrix.columns)
+
+
+def test_find_matrix_returns_the_version_fitted_on_the_same_matrix():
+    matrix = make_matrix()
+
+    assert model_registry.find_matrix("kmeans", matrix) is None
+    model_registry.register("kmeans", fit_kmeans(matrix), "calls.csv", matrix)
+    assert model_registry.find_matrix("kmeans", matrix) == "v1"
+    assert model_registry.find_matrix("kmeans", matrix.assign(theft=[1, 4, 2, 7])) is None
+
+
+def test_register_reuses_a_version_with_the_same_matrix_and_parameters():
+    matrix = make_matrix()
+
+    first = model_registry.register("kmeans", fit_kmeans(matrix), "calls.csv", matrix)
+    again = model_registry.register("kmeans", fit_kmeans(matrix), "calls.csv", matrix)
+    other_params = model_registry.register("kmeans", fit_kmeans(matrix, n_clusters=3), "calls.csv", matrix)
+    other_matrix = model_registry.register("kmeans", fit_kmeans(matrix.assign(theft=[1, 4, 2, 7])), "calls.csv",
+                                           matrix.assign(theft=[1, 4, 2, 7]))
+
+    assert again == first
+    assert model_registry.versions("kmeans") == ["v1", "v2", "v3"]
+    assert [os.path.basename(p) for p in (other_params, other_matrix)] == ["v2", "v3"]
+    assert model_registry.metadata("kmeans", "v2")["params"]["estimator"]["n_clusters"] == "3"
+
+
+def test_feature_transform_runs_after_row_normalization_and_before_the_estimator():
+    counts = np.array([[9.0, 1.0, 0.0], [1.0, 1.0, 2.0], [0.0, 4.0, 0.0], [2.0, 0.0, 2.0]])
+    sqrt = FunctionTransformer(np.sqrt).fit(counts)
+    shares = counts / counts.sum(axis=1, keepdims=True)
+    kmeans = KMeans(n_clusters=2, n_init=1, random_state=0).fit(np.sqrt(shares))
+    pipeline = ClusterPipeline(None, None, kmeans, ["a", "b", "c"], row_normalize=True, feature_transform=sqrt)
+
+    np.testing.assert_allclose(pipeline.transform(counts), np.sqrt(shares))
+    np.testing.assert_array_equal(pipeline.predict(counts), kmeans.labels_)
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+import out_of_core
+import partitioned_store
+import spd_data
+import vocabulary
+from vocabulary import Vocabulary
+
+
+def make_calls(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        spd_data.TIMESTAMP_COL: pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 90 * 24, n), unit="h"),
+        "Dispatch Neighborhood": rng.choice(["North", "south ", "EAST", "-", "Unknown"], size=n),
+        "Initial Call Type": rng.choice(["Theft", "THEFT", "noise", "Alarm ", "fire"], size=n),
+    })
+    df[spd_data.TIMESTAMP_COL] = df[spd_data.TIMESTAMP_COL].astype(str)
+    df.loc[7, spd_data.TIMESTAMP_COL] = "not a time"
+    return df
+
+
+def in_memory_matrix(df, normalize_call_types=False):
+    df = df.assign(Neighborhood=vocabulary.normalize_distinct(df["Dispatch Neighborhood"]))
+    df = spd_data.valid_calls(df)
+    call_types = vocabulary.normalize_distinct(df["Initial Call Type"]) if normalize_call_types \
+        else df["Initial Call Type"]
+    return pd.crosstab(df["Neighborhood"], call_types)
+
+
+def test_streamed_matrix_equals_crosstab_of_the_csv(tmp_path):
+    df = make_calls()
+    df.to_csv(tmp_path / "calls.csv", index=False)
+
+    matrix = out_of_core.call_type_matrix(str(tmp_path / "calls.csv"), chunk_rows=37)
+
+    pd.testing.assert_frame_equal(matrix, in_memory_matrix(df), check_names=False)
+
+
+def test_streamed_matrix_from_the_store_equals_crosstab(tmp_path):
+    df = make_calls()
+    vocab = Vocabulary()
+    vocab.add_codes(df)
+    vocab.save()
+    partitioned_store.write_store(df, tmp_path / "store")
+
+    for normalize in (False, True):
+        matrix = out_of_core.call_type_matrix(str(tmp_path / "store"), normalize, chunk_rows=37)
+        pd.testing.assert_frame_equal(matrix, in_memory_matrix(df, normalize), check_names=False)
+
+
+def test_cluster_summary_and_labels_match_an_in_memory_join(tmp_path):
+    df = make_calls()
+    clusters = pd.DataFrame({"Neighborhood": ["North", "SOUTH"], "cluster": [1, 0]})
+    matrix = in_memory_matrix(df)
+
+    summary = out_of_core.cluster_summary(matrix, clusters, "cluster", k=2)
+
+    joined = spd_data.valid_calls(df.assign(Neighborhood=vocabulary.normalize_distinct(df["Dispatch Neighborhood"])))
+    joined = joined.merge(clusters.assign(Neighborhood=clusters["Neighborhood"].str.lower()), on="Neighborhood")
+    per_cluster = joined.groupby("cluster")["Initial Call Type"].value_counts()
+    assert summary["cluster"].tolist() == [0, 1]
+    assert summary["Neighborhoods"].tolist() == [1, 1]
+    assert summary["Avg Calls per Neighborhood"].tolist() == joined.groupby("cluster").size().tolist()
+    for cluster, top in zip(summary["cluster"], summary["Top Call Types"]):
+        counts = per_cluster[cluster]
+        assert [counts[name] for name in top.split(", ")] == sorted(counts, reverse=True)[:2]
+
+    df.to_csv(tmp_path / "calls.csv", index=False)
+    chunks = spd_data.read_chunks(str(tmp_path / "calls.csv"), chunk_rows=37)
+    written = out_of_core.write_labeled(chunks, clusters, "cluster", str(tmp_path / "labeled.csv"))
+    labeled = pd.read_csv(tmp_path / "labeled.csv")
+    assert written == len(labeled) == len(joined)
+    assert labeled.groupby("Neighborhood")["cluster"].unique().map(list).to_dict() == {"north": [1], "south": [0]}
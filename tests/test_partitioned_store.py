@@ -0,0 +1,91 @@
+import pandas as pd
+import pyarrow.parquet as pq
+
+import partitioned_store
+import query_calls
+import spd_data
+from vocabulary import Vocabulary
+
+
+def make_calls():
+    df = pd.DataFrame({
+        spd_data.TIMESTAMP_COL: ["2024-01-15 08:00:00", "2024-01-20 09:30:00", "2024-02-03 23:59:00",
+                                 "2024-03-01 00:00:00", "not a time"],
+        "Dispatch Neighborhood": ["North", "South", "North", "East", "South"],
+        "Initial Call Type": ["theft", "noise", "theft", "theft", "noise"],
+    })
+    vocab = Vocabulary()
+    vocab.add_codes(df)
+    vocab.save()
+    return df
+
+
+def test_write_keeps_unparseable_times_in_a_null_partition(tmp_path):
+    store = tmp_path / "store"
+    stats = partitioned_store.write_store(make_calls(), store)
+
+    assert sum(e["rows"] for e in stats) == 5
+    assert [e["path"].split("/part")[0] for e in stats] == [
+        "year=2024/month=01", "year=2024/month=02", "year=2024/month=03", partitioned_store.NULL_PARTITION]
+    assert len(partitioned_store.load_calls(store_dir=store)) == 5
+    assert sum(len(c) for c in partitioned_store.read_chunks(store_dir=store)) == 5
+
+
+def test_select_partitions_prunes_by_time_and_neighborhood(tmp_path):
+    store = tmp_path / "store"
+    partitioned_store.write_store(make_calls(), store)
+
+    in_range = partitioned_store.select_partitions("2024-01-01", "2024-02-01", store_dir=store)
+    assert [e["month"] for e in in_range] == [1]
+
+    codes = partitioned_store.neighborhood_codes(["EAST"])
+    assert [e["month"] for e in partitioned_store.select_partitions(codes=codes, store_dir=store)] == [3]
+
+
+def test_load_calls_filters_rows_inside_partitions(tmp_path):
+    store = tmp_path / "store"
+    partitioned_store.write_store(make_calls(), store)
+
+    df = partitioned_store.load_calls("2024-01-16", "2024-03-01", neighborhoods=["north"], store_dir=store)
+    assert df["Neighborhood"].tolist() == ["north"]
+    assert df[spd_data.TIMESTAMP_COL].tolist() == [pd.Timestamp("2024-02-03 23:59:00")]
+
+
+def test_load_calls_with_no_matching_partition_returns_typed_empty_frame(tmp_path):
+    store = tmp_path / "store"
+    partitioned_store.write_store(make_calls(), store)
+
+    df = partitioned_store.load_calls("2030-01-01", "2030-02-01", columns=[spd_data.TIMESTAMP_COL], store_dir=store)
+    assert df.empty
+    assert "Neighborhood" in df
+    assert str(df["neighborhood_code"].dtype) == "int16"
+
+
+def test_duckdb_reads_the_partition_columns_as_integers_with_a_null_partition(tmp_path):
+    store = tmp_path / "store"
+    partitioned_store.write_store(make_calls(), store)
+
+    con = query_calls.connect(str(store))
+    try:
+        assert con.execute("SELECT count(*) FROM calls WHERE year = 2024").fetchone()[0] == 4
+        assert con.execute("SELECT count(*) FROM calls WHERE month = 1").fetchone()[0] == 2
+        assert con.execute("SELECT count(*) FROM calls WHERE year IS NULL").fetchone()[0] == 1
+    finally:
+        con.close()
+
+
+def test_build_from_csv_writes_every_chunk_with_the_same_schema(tmp_path):
+    df = make_calls()
+    # Blank in the first chunk, text later: per-chunk inference would give two column types
+    df["Dispatch Beat"] = [None, None, None, "B1", "B2"]
+    df["Latitude"] = [47.6, 47.61, None, None, 47.7]
+    df.to_csv(tmp_path / "calls.csv", index=False)
+    store = tmp_path / "store"
+
+    stats = partitioned_store.build_from_csv(str(tmp_path / "calls.csv"), store, chunk_rows=2)
+
+    schemas = {str(pq.read_schema(store / entry["path"]).remove_metadata()) for entry in stats}
+    assert len(schemas) == 1
+    loaded = partitioned_store.load_calls(store_dir=store).sort_values("Latitude")
+    assert loaded["Latitude"].dtype == "float64"
+    assert sorted(loaded["Dispatch Beat"].dropna()) == ["B1", "B2"]
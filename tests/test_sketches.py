@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from sketches import QuantileSketch
+
+
+def make_response_times(n=100_000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "priority": rng.integers(1, 4, size=n),
+        "minutes": rng.lognormal(mean=2.0, sigma=1.0, size=n),
+    })
+
+
+def rank_error(values, estimate, q):
+    """How far the estimate's rank is from q, as a fraction of the values."""
+    return abs(np.searchsorted(np.sort(values), estimate) / len(values) - q)
+
+
+def test_quantiles_stay_within_a_small_rank_error():
+    df = make_response_times()
+    result = QuantileSketch(["priority"]).update(df, "minutes").quantiles((0.5, 0.9, 0.99))
+
+    for row in result.itertuples(index=False):
+        values = df.loc[df["priority"] == row.priority, "minutes"].to_numpy()
+        assert row.count == len(values)
+        assert rank_error(values, row.p50, 0.5) < 0.01
+        assert rank_error(values, row.p90, 0.9) < 0.005
+        assert rank_error(values, row.p99, 0.99) < 0.002
+
+
+def test_merged_chunk_sketches_agree_with_one_pass():
+    df = make_response_times()
+    whole = QuantileSketch(["priority"]).update(df, "minutes").quantiles()
+    merged = QuantileSketch(["priority"])
+    for start in range(0, len(df), 30_000):
+        merged.merge(QuantileSketch(["priority"]).update(df[start:start + 30_000], "minutes"))
+    merged = merged.quantiles().sort_values("priority").reset_index(drop=True)
+    whole = whole.sort_values("priority").reset_index(drop=True)
+
+    pd.testing.assert_series_equal(merged["count"], whole["count"])
+    np.testing.assert_allclose(merged[["p50", "p90", "p99"]], whole[["p50", "p90", "p99"]], rtol=0.02)
+
+
+def test_null_values_are_skipped():
+    df = pd.DataFrame({"priority": [1, 1, 1, 2], "minutes": [1.0, np.nan, 3.0, np.nan]})
+
+    result = QuantileSketch(["priority"]).update(df, "minutes").quantiles((0.5,))
+
+    assert result[["priority", "count", "p50"]].values.tolist() == [[1, 2, 2.0]]
+
+
+def test_quantile_columns_keep_every_decimal():
+    df = make_response_times(n=1_000)
+
+    result = QuantileSketch(["priority"]).update(df, "minutes").quantiles((0.5, 0.9, 0.99, 0.999, 1.0))
+
+    assert list(result.columns[2:]) == ["p50", "p90", "p99", "p99.9", "p100"]
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+import station_weather
+
+
+def test_idw_weights_use_the_k_nearest_sources_and_sum_to_one():
+    sources = np.array([[0.0, 0.0], [1000.0, 0.0], [0.0, 3000.0], [50_000.0, 0.0]])
+    targets = np.array([[0.0, 0.0], [500.0, 0.0]])
+
+    W = station_weather.idw_weights(targets, sources, k=2, power=2)
+
+    np.testing.assert_allclose(W.sum(axis=1), 1.0)
+    assert (np.count_nonzero(W, axis=1) == 2).all()
+    # The co-located source is floored at MIN_DISTANCE_M instead of getting infinite weight
+    np.testing.assert_allclose(W[0, :2], np.array([1 / 100 ** 2, 1 / 1000 ** 2]) / (1 / 100 ** 2 + 1 / 1000 ** 2))
+    np.testing.assert_allclose(W[1, :2], [0.5, 0.5])
+
+
+def test_hour_index_converts_local_times_to_utc_hours():
+    start = pd.Timestamp("2024-11-03 07:00")  # 00:00 PDT
+    timestamps = pd.Series(["2024-11-03 00:30:00", "2024-11-03 01:30:00", "2024-11-03 03:10:00", "not a time"])
+
+    # The repeated 01:00 hour is read as daylight time rather than dropped
+    np.testing.assert_array_equal(station_weather.hour_index(timestamps, start), [0, 1, 4, -1])
+
+
+def test_attach_neighborhood_weather_looks_up_the_call_hour_and_neighborhood():
+    cube = {
+        "cube": np.arange(3 * 2 * 2, dtype=np.float32).reshape(3, 2, 2),
+        "neighborhoods": np.array(["ballard", "fremont"]),
+        "variables": np.array(["temp", "prcp"]),
+        "start": pd.Timestamp("2024-06-01 07:00"),  # 00:00 PDT
+    }
+    df = pd.DataFrame({
+        "Original Time Queued": ["2024-06-01 02:15:00", "2024-06-01 00:05:00", "2024-06-01 01:00:00",
+                                 "2024-06-02 00:00:00"],
+        "Dispatch Neighborhood": [" FREMONT", "Ballard", "Nowhere", "ballard"],
+    })
+
+    station_weather.attach_neighborhood_weather(df, timestamp_col="Original Time Queued", cube=cube)
+
+    np.testing.assert_array_equal(df["temp_local"], [cube["cube"][2, 1, 0], cube["cube"][0, 0, 0], np.nan, np.nan])
+    np.testing.assert_array_equal(df["prcp_local"], [cube["cube"][2, 1, 1], cube["cube"][0, 0, 1], np.nan, np.nan])
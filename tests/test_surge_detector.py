@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+import spd_data
+from surge_detector import HOURS_PER_WEEK, SurgeDetector, encode_events
+from vocabulary import Vocabulary
+
+
+def make_vocab():
+    return Vocabulary({"Dispatch Neighborhood": ["north", "south"], "Initial Call Type": ["theft", "noise"]})
+
+
+def test_encode_events_skips_unparseable_times():
+    df = pd.DataFrame({
+        spd_data.TIMESTAMP_COL: ["2024-01-01 10:05:00", "not a time", "2024-01-01 09:00:00"],
+        "Dispatch Neighborhood": ["North", "South", " south "],
+        "Initial Call Type": ["THEFT", "noise", "Noise"],
+    })
+    events = encode_events(df, make_vocab())
+
+    assert events["seconds"].dtype == np.int64
+    assert events["neighborhood"].tolist() == [1, 0]
+    assert events["call_type"].tolist() == [1, 0]
+    assert events["seconds"].tolist() == [pd.Timestamp("2024-01-01 09:00").value // 10**9,
+                                          pd.Timestamp("2024-01-01 10:05").value // 10**9]
+
+
+def test_from_history_runs_on_events_with_a_nat_row():
+    df = pd.DataFrame({
+        spd_data.TIMESTAMP_COL: ["2024-01-01 10:05:00", None, "2024-01-08 10:30:00"],
+        "Dispatch Neighborhood": ["north", "north", "north"],
+        "Initial Call Type": ["theft", "theft", "theft"],
+    })
+    events = encode_events(df, make_vocab())
+    detector = SurgeDetector.from_history(events["neighborhood"].to_numpy(), events["call_type"].to_numpy(),
+                                          (events["seconds"] // 3600).to_numpy(), 2, 2)
+
+    assert detector.current_hour == events["seconds"].max() // 3600 + 1
+    assert detector.mean.shape == (HOURS_PER_WEEK, 2, 2)
+    assert detector.mean[:, 0, 0].max() > 0
+    assert detector.mean[:, 1].max() == 0
+
+
+def test_observe_alerts_once_per_hour_and_cell():
+    detector = SurgeDetector(1, 1, min_count=3)
+    hour = 1_000_000
+    alerts = [detector.observe(0, 0, hour * 3600 + i) for i in range(5)]
+
+    assert [a is not None for a in alerts] == [False, False, True, False, False]
+    assert alerts[2][0] == 3
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+import top_call_types
+from sketches import TopKSketch
+
+
+def make_calls(n=20_000, seed=0):
+    rng = np.random.default_rng(seed)
+    call_types = np.array([f"type {i:02d}" for i in range(40)])
+    weights = 1.0 / np.arange(1, 41) ** 1.2
+    return pd.DataFrame({
+        "Neighborhood": rng.choice(["ballard", "fremont", "-", "unknown"], size=n, p=[0.5, 0.4, 0.05, 0.05]),
+        "Initial Call Type": rng.choice(call_types, size=n, p=weights / weights.sum()),
+    })
+
+
+def test_neighborhood_top_strings_are_exact_and_skip_invalid_neighborhoods():
+    df = pd.DataFrame({
+        "Neighborhood": ["ballard"] * 5 + ["fremont"] * 3 + ["-"] * 4,
+        "Initial Call Type": ["noise", "theft", "noise", "alarm", "theft", "alarm", "alarm", "noise",
+                              "fire", "fire", "fire", "fire"],
+    })
+
+    top = top_call_types.neighborhood_top_strings(df, k=2)
+
+    assert top.to_dict() == {"ballard": "noise, theft", "fremont": "alarm, noise"}
+
+
+def test_sketch_counts_stay_within_their_error_bounds():
+    df = make_calls()
+    sketch = TopKSketch(["Neighborhood"], capacity=16).update(df, "Initial Call Type")
+    true = df.groupby(["Neighborhood", "Initial Call Type"]).size()
+
+    top = sketch.top(5)
+    exact = true.loc[list(zip(top["Neighborhood"], top["item"]))].to_numpy()
+    assert (top["lower_bound"].to_numpy() <= exact).all()
+    assert (exact <= top["count"].to_numpy()).all()
+    assert (top["max_error"] <= top["key_total"] / 16).all()
+
+
+def test_merged_chunk_sketches_match_one_sketch_of_the_whole_frame():
+    df = make_calls()
+    whole = TopKSketch(["Neighborhood"]).update(df, "Initial Call Type")
+    merged = TopKSketch(["Neighborhood"]).update(df[:7_000], "Initial Call Type").merge(
+        TopKSketch(["Neighborhood"]).update(df[7_000:], "Initial Call Type"))
+
+    pd.testing.assert_series_equal(merged.top_strings(3), whole.top_strings(3))
+    assert merged.totals.sum() == len(df)
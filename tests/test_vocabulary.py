@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+import vocabulary
+from vocabulary import Vocabulary
+
+
+def test_encode_normalizes_and_round_trips_through_decode():
+    vocab = Vocabulary()
+    names = pd.Series(["Ballard", " ballard", "FREMONT ", "fremont"])
+
+    codes = vocab.encode("Dispatch Neighborhood", names)
+
+    assert codes.dtype == vocabulary.CODE_DTYPE
+    assert codes.tolist() == [0, 0, 1, 1]
+    assert vocab.decode("Dispatch Neighborhood", codes).tolist() == ["ballard", "ballard", "fremont", "fremont"]
+
+
+def test_codes_are_stable_across_save_and_load():
+    vocab = Vocabulary()
+    vocab.encode("Initial Call Type", pd.Series(["theft", "noise"]))
+    vocab.save()
+
+    loaded = Vocabulary.load()
+    codes = loaded.encode("Initial Call Type", pd.Series(["alarm", "noise", "theft"]))
+
+    assert codes.tolist() == [2, 1, 0]
+    assert loaded.terms["Initial Call Type"] == ["theft", "noise", "alarm"]
+
+
+def test_encode_without_grow_marks_unknown_names_and_decode_maps_them_to_nan():
+    vocab = Vocabulary({"Dispatch Neighborhood": ["ballard"]})
+
+    codes = vocab.encode("Dispatch Neighborhood", pd.Series(["BALLARD", "nowhere"]), grow=False)
+
+    assert codes.tolist() == [0, -1]
+    decoded = vocab.decode("Dispatch Neighborhood", codes)
+    assert decoded[0] == "ballard" and np.isnan(decoded[1])
+    assert vocab.terms["Dispatch Neighborhood"] == ["ballard"]
+
+
+def test_decode_column_matches_string_normalization():
+    df = pd.DataFrame({"Dispatch Neighborhood": ["North ", "north", "SOUTH", "-"]})
+    expected = df["Dispatch Neighborhood"].astype(str).str.lower().str.strip()
+
+    pd.testing.assert_series_equal(vocabulary.decode_column(df, "Dispatch Neighborhood"), expected)
+
+    vocab = Vocabulary()
+    vocab.add_codes(df)
+    vocab.save()
+    pd.testing.assert_series_equal(vocabulary.decode_column(df, "Dispatch Neighborhood"), expected)
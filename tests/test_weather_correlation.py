@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+import spd_data
+import weather_correlation
+
+
+def make_calls():
+    return pd.DataFrame({
+        spd_data.TIMESTAMP_COL: ["2024-06-01 00:10:00", "2024-06-01 00:50:00", "2024-06-01 02:05:00",
+                                 "2024-06-01 02:30:00", "2024-06-05 00:00:00", "not a time"],
+        "Dispatch Neighborhood": ["North", "north", "South", "-", "North", "North"],
+        "Initial Call Type": ["theft", "noise", "theft", "theft", "theft", "theft"],
+    })
+
+
+def test_hourly_counts_bin_local_calls_on_the_utc_hour_axis():
+    hours = pd.date_range("2024-06-01 07:00", periods=3, freq="h")  # 00:00-02:59 PDT
+
+    matrices = weather_correlation.hourly_counts(make_calls(), hours)
+
+    counts, labels = matrices["neighborhood"]
+    assert labels.tolist() == ["north", "south"]
+    np.testing.assert_array_equal(counts, [[2, 0], [0, 0], [0, 1]])
+    counts, labels = matrices["call_type"]
+    np.testing.assert_array_equal(counts[:, labels.tolist().index("theft")], [1, 0, 2])
+
+
+def test_hourly_and_daily_counts_agree_on_totals():
+    df = make_calls()
+    days = pd.date_range("2024-06-01", "2024-06-05", freq="D")
+    hours = pd.date_range("2024-06-01 07:00", "2024-06-06 07:00", freq="h", inclusive="left")
+
+    daily = weather_correlation.daily_counts(df, days)["call_type"][0]
+    hourly = weather_correlation.hourly_counts(df, hours)["call_type"][0]
+
+    assert daily.sum() == hourly.sum() == 5
+
+
+def test_lagged_features_shift_by_periods_and_name_the_window_unit():
+    hours = pd.date_range("2024-06-01", periods=4, freq="h")
+    weather = pd.DataFrame({"temp": [10.0, 11.0, 12.0, 13.0]}, index=hours)
+
+    features, meta = weather_correlation.lagged_features(weather, lags=[0, 1], windows=[2], unit="h")
+
+    np.testing.assert_array_equal(features[:, 1], [np.nan, 10, 11, 12])
+    np.testing.assert_array_equal(features[:, 2], [np.nan, 10.5, 11.5, 12.5])
+    assert meta["feature"].tolist() == ["lag", "lag", "rolling_mean_2h"]
+
+
+def test_hourly_controls_use_local_hour_of_week():
+    hours = pd.date_range("2024-06-03 07:00", periods=2, freq="h")  # Monday 00:00 and 01:00 PDT
+
+    Z = weather_correlation.hourly_controls(hours)
+
+    assert Z.shape == (2, 7 * 24 + 1)
+    assert Z[0, 0] == 1 and Z[1, 1] == 1